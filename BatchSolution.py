@@ -0,0 +1,138 @@
+# Group 8 - Project 2
+# ECE 2774
+# Scenario-Batched Newton-Raphson
+
+import numpy as np
+import scipy.sparse as sp
+from Jacobian import Jacobian
+from Solution import Solution
+from SparseLU import SparseLU
+from SystemSettings import SystemSettings
+
+
+class BatchSolution:
+
+    def __init__(self, circuit, p_injection=None, q_injection=None):
+        # K scenarios sharing the Circuit's topology and bus types, with different injections
+        # p_injection / q_injection: (K, N) net injected MW / MVAR per bus in bus order; either one
+        # defaults to the Circuit's own injections repeated for every scenario
+        base = Solution(circuit)
+        self.circuit = circuit
+        self.bus_names = base.bus_names
+        self.ybus = base.ybus
+        self.pv_pq, self.pq = base.pv_pq, base.pq
+        self.jacobian = Jacobian(base)
+        self.pattern = self.jacobian.calc_sparse_pattern()
+
+        K = len(p_injection) if p_injection is not None else len(q_injection) if q_injection is not None else 1
+        self.p_specified = self.calc_specified(p_injection, base.p_specified, K)
+        self.q_specified = self.calc_specified(q_injection, base.q_specified, K)
+
+        # stacked state, one row per scenario
+        self.V = np.tile(base.voltage_vector(), (K, 1))
+        self.converged = np.zeros(K, dtype=bool)
+        self.diverged = np.zeros(K, dtype=bool)
+        self.iterations = np.zeros(K, dtype=int)
+
+    def calc_specified(self, injection, base, K):
+        if injection is None:
+            return np.tile(base, (K, 1))
+        injection = np.asarray(injection, dtype=float) / SystemSettings.Sbase
+        if injection.shape != (K, len(self.bus_names)):
+            raise ValueError(f"Injections must have shape (K, N) = ({K}, {len(self.bus_names)}).")
+        return injection
+
+    def compute_power_mismatch(self, active):
+        # (K_active, n_pv_pq + n_pq) mismatch rows for the active scenarios
+        V = self.V[active]
+        S = V * np.conj((self.ybus @ V.T).T)
+
+        delta_p = self.p_specified[active][:, self.pv_pq] - S.real[:, self.pv_pq]
+        delta_q = self.q_specified[active][:, self.pq] - S.imag[:, self.pq]
+        return np.hstack((delta_p, delta_q))
+
+    def calc_jacobian_block(self, active):
+        # the Jacobians of all active scenarios as one block-diagonal CSC matrix on the shared pattern
+        pat = self.pattern
+        K, size, nnz = len(active), pat["size"], len(pat["indices"])
+
+        values = self.jacobian.calc_jacobian_values(self.V[active])
+        indices = (pat["indices"][None, :] + size * np.arange(K)[:, None]).ravel()
+        indptr = np.append((pat["indptr"][None, :-1] + nnz * np.arange(K)[:, None]).ravel(), K * nnz)
+
+        return sp.csc_matrix((values.ravel(), indices, indptr), shape=(K * size, K * size))
+
+    def solve_block(self, active, mismatches):
+        # Δx for every active scenario from one factorization of the block-diagonal Jacobian;
+        # if it is singular, scenarios are factorized one at a time and the singular ones get NaN
+        try:
+            return SparseLU().factorize(self.calc_jacobian_block(active)).solve(mismatches.ravel()).reshape(
+                mismatches.shape)
+        except RuntimeError:
+            delta_x = np.full(mismatches.shape, np.nan)
+            for row, k in enumerate(active):
+                try:
+                    delta_x[row] = SparseLU().factorize(self.calc_jacobian_block([k])).solve(mismatches[row])
+                except RuntimeError:
+                    pass
+            return delta_x
+
+    def newton_raphson(self, tolerance=0.001, max_iterations=50, divergence_limit=1e4, stall_iterations=10):
+        # all scenarios iterate together; a scenario leaves the active set as soon as it converges
+        # (or its step is not finite), so later iterations only work on the ones still running
+        # a scenario is marked diverged and dropped as in Solution.newton_raphson: its max mismatch
+        # is not finite, grows past divergence_limit times its smallest one so far or has not
+        # improved on it for stall_iterations iterations
+        active = np.flatnonzero(~self.converged)
+        n_pv_pq = len(self.pv_pq)
+        best = np.full(len(self.V), np.inf)  # smallest max mismatch of each scenario
+        best_iteration = np.zeros(len(self.V), dtype=int)
+
+        for i in range(max_iterations):
+            if len(active) == 0:
+                break
+
+            mismatches = self.compute_power_mismatch(active)
+            max_mismatch = np.max(np.abs(mismatches), axis=1)
+            done = max_mismatch < tolerance
+            self.converged[active[done]] = True
+            self.iterations[active[done]] = i + 1
+            active, mismatches, max_mismatch = active[~done], mismatches[~done], max_mismatch[~done]
+
+            improved = max_mismatch < best[active]
+            best[active[improved]] = max_mismatch[improved]
+            best_iteration[active[improved]] = i
+            diverging = ~np.isfinite(max_mismatch)
+            if divergence_limit is not None:
+                diverging |= max_mismatch > divergence_limit * best[active]
+            if stall_iterations is not None:
+                diverging |= i - best_iteration[active] >= stall_iterations
+            self.diverged[active[diverging]] = True
+            self.iterations[active[diverging]] = i + 1
+            active, mismatches = active[~diverging], mismatches[~diverging]
+            if len(active) == 0:
+                break
+
+            delta_x = self.solve_block(active, mismatches)
+            failed = ~np.all(np.isfinite(delta_x), axis=1)
+            self.iterations[active[failed]] = i + 1
+            active, delta_x = active[~failed], delta_x[~failed]
+
+            V = self.V[active]
+            vm, va = np.abs(V), np.angle(V)
+            va[:, self.pv_pq] += delta_x[:, :n_pv_pq]
+            vm[:, self.pq] += delta_x[:, n_pv_pq:]
+            self.V[active] = vm * np.exp(1j * va)
+
+        self.iterations[active] = max_iterations
+        return self.converged
+
+    @property
+    def voltages(self):
+        # (K, N) voltage magnitudes in p.u.
+        return np.abs(self.V)
+
+    @property
+    def angles(self):
+        # (K, N) voltage angles in radians
+        return np.angle(self.V)
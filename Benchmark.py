@@ -0,0 +1,189 @@
+# Group 8 - Project 2
+# ECE 2774
+# Benchmark Suite
+
+import argparse
+import json
+import platform
+import sys
+import time
+import numpy as np
+import pandas as pd
+import scipy
+from FaultSweep import FaultSweep
+from Jacobian import Jacobian
+from Solution import Solution
+from SyntheticGrid import SyntheticGrid
+
+# timed steps; the dense calc_jacobian and newton_raphson are skipped above dense_limit buses (NaN)
+STEPS = ("build", "calc_ybus", "calc_sequence_zbuses", "calc_jacobian", "calc_jacobian_sparse",
+         "newton_raphson", "newton_raphson_sparse", "fault_sweep")
+
+
+class Benchmark:
+
+    def __init__(self, sizes=(10, 100, 1000, 10000), repeat: int = 3, dense_limit: int = 2000,
+                 fault_buses: int = 500, seed: int = 0):
+        # sizes: bus counts of the synthetic grids; every step is timed repeat times and the
+        # fastest run is kept; the fault sweep covers all fault types at fault_buses buses
+        # spread over the grid (or every bus on smaller grids)
+        self.sizes = [int(size) for size in sizes]
+        self.repeat = repeat
+        self.dense_limit = dense_limit
+        self.fault_buses = fault_buses
+        self.seed = seed
+        self.results = None
+
+    def time_call(self, call, setup=None):
+        # best wall time of call() in seconds; setup() runs untimed before every call
+        best = np.inf
+        for _ in range(self.repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            call()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    def run_size(self, num_buses: int):
+        # {step: seconds} for one synthetic grid
+        timings = dict.fromkeys(STEPS, np.nan)
+        grid = SyntheticGrid(num_buses, self.seed)
+        timings["build"] = self.time_call(grid.build)
+        circuit = grid.build()
+        timings["calc_ybus"] = self.time_call(circuit.calc_network_matrices, circuit.reset_network_matrices)
+        timings["calc_sequence_zbuses"] = self.time_call(circuit.calc_sequence_zbuses,
+                                                         circuit.invalidate_cached_matrices)
+
+        jacobian = Jacobian(Solution(circuit))
+        timings["calc_jacobian_sparse"] = self.time_call(jacobian.calc_jacobian_sparse)
+
+        # every solve starts from the flat start of a new Solution
+        state = {}
+
+        def flat_start():
+            state["solution"] = Solution(circuit)
+
+        def newton_raphson(sparse):
+            if not state["solution"].newton_raphson(sparse=sparse, verbose=False):
+                raise RuntimeError(f"Newton-Raphson did not converge on the {num_buses}-bus grid.")
+
+        timings["newton_raphson_sparse"] = self.time_call(lambda: newton_raphson(True), flat_start)
+        if num_buses <= self.dense_limit:
+            timings["calc_jacobian"] = self.time_call(jacobian.calc_jacobian)
+            timings["newton_raphson"] = self.time_call(lambda: newton_raphson(False), flat_start)
+
+        bus_names = list(circuit.buses.keys())
+        positions = np.unique(np.linspace(0, len(bus_names) - 1, min(len(bus_names), self.fault_buses)).astype(int))
+        sweep = FaultSweep(circuit)
+        timings["fault_sweep"] = self.time_call(
+            lambda: sweep.run([bus_names[k] for k in positions], include_voltages=False))
+
+        return timings
+
+    def run(self, verbose: bool = True):
+        # timings table: one row per grid size, one column per step (seconds)
+        rows = []
+        for size in self.sizes:
+            rows.append(self.run_size(size))
+            if verbose:
+                print(f"{size:>7} buses: " + "  ".join(f"{step} {rows[-1][step]:.4g}s"
+                                                       for step in STEPS if not np.isnan(rows[-1][step])))
+        self.results = pd.DataFrame(rows, index=pd.Index(self.sizes, name="buses"), columns=list(STEPS))
+        return self.results
+
+    def scaling(self, results=None):
+        # scaling curve of each step: the exponent k of time ~ buses^k between consecutive sizes,
+        # and a least-squares fit over all sizes ("overall")
+        results = self.results if results is None else results
+        log_n = np.log(results.index.to_numpy(dtype=float))
+
+        curves = {}
+        for step in results.columns:
+            t = results[step].to_numpy(dtype=float)
+            valid = ~np.isnan(t) & (t > 0)
+            n, lt = log_n[valid], np.log(t[valid])
+            exponents = dict(zip(results.index[valid][1:], np.diff(lt) / np.diff(n)))
+            exponents["overall"] = np.polyfit(n, lt, 1)[0] if valid.sum() > 1 else np.nan
+            curves[step] = exponents
+
+        return pd.DataFrame(curves).reindex(list(results.index[1:]) + ["overall"])
+
+    def save(self, path: str, results=None):
+        # baseline file: timings plus the settings and library versions they were measured with
+        results = self.results if results is None else results
+        baseline = {
+            "settings": {"repeat": self.repeat, "dense_limit": self.dense_limit, "fault_buses": self.fault_buses,
+                         "seed": self.seed},
+            "environment": {"python": platform.python_version(), "numpy": np.__version__,
+                            "scipy": scipy.__version__, "machine": platform.machine(),
+                            "processor": platform.processor()},
+            "timings": {str(size): {step: (None if np.isnan(t) else t) for step, t in row.items()}
+                        for size, row in results.iterrows()},
+        }
+        with open(path, "w") as f:
+            json.dump(baseline, f, indent=2)
+
+    @staticmethod
+    def load_baseline(path: str):
+        with open(path) as f:
+            baseline = json.load(f)
+        results = pd.DataFrame.from_dict(baseline["timings"], orient="index", dtype=float)
+        results.index = pd.Index(results.index.astype(int), name="buses")
+        return results
+
+    def compare(self, baseline_path: str, results=None, threshold: float = 1.25, min_difference: float = 0.001):
+        # every (size, step) timed both now and in the baseline, with ratio = current / baseline;
+        # a step is a regression when it got slower than threshold times its baseline and by more
+        # than min_difference seconds (sub-millisecond steps on small grids are mostly timer noise)
+        results = self.results if results is None else results
+        baseline = self.load_baseline(baseline_path)
+
+        rows = []
+        for size in results.index.intersection(baseline.index):
+            for step in results.columns.intersection(baseline.columns):
+                current, base = results.at[size, step], baseline.at[size, step]
+                if np.isnan(current) or np.isnan(base):
+                    continue
+                rows.append((size, step, base, current, current / base,
+                             current / base > threshold and current - base > min_difference))
+
+        return pd.DataFrame(rows, columns=["buses", "step", "baseline", "current", "ratio", "regression"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the simulator on synthetic grids of increasing size.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--dense-limit", type=int, default=2000)
+    parser.add_argument("--fault-buses", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write the timings to this baseline file (JSON)")
+    parser.add_argument("--compare", help="baseline file to compare the timings against")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    parser.add_argument("--min-difference", type=float, default=0.001)
+    args = parser.parse_args()
+
+    benchmark = Benchmark(args.sizes, args.repeat, args.dense_limit, args.fault_buses, args.seed)
+    results = benchmark.run()
+
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print("\nTimings (s)")
+        print(results.to_string(float_format=lambda t: f"{t:.4g}"))
+        if len(results) > 1:
+            print("\nScaling exponents (time ~ buses^k)")
+            print(benchmark.scaling().to_string(float_format=lambda k: f"{k:.2f}"))
+
+        if args.save:
+            benchmark.save(args.save)
+            print(f"\nBaseline written to {args.save}")
+
+        if args.compare:
+            comparison = benchmark.compare(args.compare, threshold=args.threshold,
+                                           min_difference=args.min_difference)
+            print(f"\nComparison with {args.compare}")
+            print(comparison.to_string(index=False, float_format=lambda t: f"{t:.4g}"))
+            regressions = comparison[comparison["regression"]]
+            if not regressions.empty:
+                print(f"\n{len(regressions)} step(s) slower than {args.threshold}x the baseline")
+                sys.exit(1)
@@ -3,15 +3,13 @@
 # Milestone 1
 
 class Bus:
-    # Class variable to keep track of the number of Bus instances
-    instance_count = 0
 
-    def __init__(self, name: str, base_kv: float):
+    __slots__ = ("name", "base_kv", "vpu", "delta", "bus_type", "index")
+
+    def __init__(self, name: str, base_kv: float, index: int = None):
         self.name = name
         self.base_kv = base_kv
         self.vpu = 1
         self.delta = 0
         self.bus_type = "PQ Bus"
-
-        Bus.instance_count += 1
-        self.index = Bus.instance_count
\ No newline at end of file
+        self.index = index  # row/column in the bus matrices, assigned by the owning Circuit
\ No newline at end of file
@@ -0,0 +1,189 @@
+# Group 8 - Project 2
+# ECE 2774
+# Case File Importer
+
+import os
+import re
+import numpy as np
+from Circuit import Circuit
+from SystemSettings import SystemSettings
+
+# columns used from each MATPOWER table (IEEE CDF records are converted to the same layout)
+BUS_COLUMNS = 10  # BUS_I, BUS_TYPE, PD, QD, GS, BS, BUS_AREA, VM, VA, BASE_KV
+GEN_COLUMNS = 8  # GEN_BUS, PG, QG, QMAX, QMIN, VG, MBASE, GEN_STATUS
+BRANCH_COLUMNS = 11  # F_BUS, T_BUS, BR_R, BR_X, BR_B, RATE_A, RATE_B, RATE_C, TAP, SHIFT, BR_STATUS
+
+
+class CaseImporter:
+
+    def __init__(self, path: str, transformer_connection: str = "Y-Y", grounding_impedance: float = 0.0):
+        # path: MATPOWER case (.m) or IEEE Common Data Format file (any other extension)
+        # case files carry no winding connections or grounding, so every transformer gets
+        # transformer_connection and every transformer and generator gets grounding_impedance
+        self.path = path
+        self.transformer_connection = transformer_connection
+        self.grounding_impedance = grounding_impedance
+
+    def rows(self):
+        # (table, row) pairs read one line at a time, never holding the whole file
+        if self.path.lower().endswith(".m"):
+            return self.read_matpower()
+        return self.read_ieee_cdf()
+
+    def read_matpower(self):
+        section = None
+        with open(self.path) as f:
+            for line in f:
+                line = line.split("%", 1)[0].strip()
+                if not line:
+                    continue
+
+                if section is None:
+                    match = re.match(r"mpc\.(\w+)\s*=\s*(.*)", line)
+                    if match is None:
+                        continue
+                    name, rest = match.groups()
+                    if name == "baseMVA":
+                        yield "baseMVA", [float(rest.rstrip(";").strip())]
+                    elif rest.startswith("["):
+                        section, line = name, rest[1:]
+                    if section is None:
+                        continue
+
+                end = "]" in line
+                for row in line.split("]")[0].split(";"):
+                    values = row.replace(",", " ").split()
+                    if values:
+                        yield section, [float(v) for v in values]
+                if end:
+                    section = None
+
+    def read_ieee_cdf(self):
+        section = None
+        with open(self.path) as f:
+            title = f.readline()
+            try:
+                yield "baseMVA", [float(title[31:37])]
+            except ValueError:
+                yield "baseMVA", [SystemSettings.Sbase]
+
+            for line in f:
+                if section is None:
+                    if line.startswith("BUS DATA FOLLOWS"):
+                        section = "bus"
+                    elif line.startswith("BRANCH DATA FOLLOWS"):
+                        section = "branch"
+                    elif line.startswith("END OF DATA"):
+                        break
+                    continue
+
+                if line.strip().startswith("-999"):
+                    section = None
+                elif section == "bus":
+                    yield from self.cdf_bus_rows(line)
+                else:
+                    yield "branch", self.cdf_branch_row(line)
+
+    def cdf_bus_rows(self, line):
+        # bus card -> MATPOWER bus row, plus a gen row for PV / swing buses and buses with generation
+        # (columns 1-4 number, 7-18 name, then whitespace-separated fields)
+        number = float(line[0:4])
+        area, zone, bus_type, vm, va, pd, qd, pg, qg, base_kv, v_desired, qmax, qmin, gs, bs = \
+            (float(v) for v in line[18:].split()[:15])
+        bus_type = {0: 1, 1: 1, 2: 2, 3: 3}.get(int(bus_type), 1)
+
+        yield "bus", [number, bus_type, pd, qd, gs * SystemSettings.Sbase, bs * SystemSettings.Sbase, area, vm, va,
+                      base_kv]
+        if bus_type in (2, 3) or pg != 0:
+            yield "gen", [number, pg, qg, qmax, qmin, v_desired if v_desired > 0 else vm, SystemSettings.Sbase, 1]
+
+    def cdf_branch_row(self, line):
+        # branch card -> MATPOWER branch row
+        fields = [float(v) for v in line.split()]
+        f, t, r, x, b, rate_a, rate_b, rate_c = fields[0], fields[1], *fields[6:12]
+        ratio, shift = (fields[14], fields[15]) if len(fields) > 15 else (0.0, 0.0)
+        return [f, t, r, x, b, rate_a, rate_b, rate_c, ratio, shift, 1]
+
+    def table(self, rows, width):
+        # rows of varying length -> (n, width) array, missing trailing columns filled with zeros
+        array = np.zeros((len(rows), width))
+        for k, row in enumerate(rows):
+            row = row[:width]
+            array[k, :len(row)] = row
+        return array
+
+    def load(self, name: str = None):
+        # builds a Circuit from the case with the bulk add_*_many calls
+        # lines keep the case's R, X and B; off-nominal taps, phase shifts, transformer charging and
+        # bus shunts have no counterpart in the element models and are not imported
+        tables = {"bus": [], "gen": [], "branch": []}
+        base_mva = SystemSettings.Sbase
+        for section, row in self.rows():
+            if section == "baseMVA":
+                base_mva = row[0]
+            elif section in tables:
+                tables[section].append(row)
+
+        bus = self.table(tables["bus"], BUS_COLUMNS)
+        gen = self.table(tables["gen"], GEN_COLUMNS)
+        branch = self.table(tables["branch"], BRANCH_COLUMNS)
+
+        circuit = Circuit(name or os.path.splitext(os.path.basename(self.path))[0])
+        scale = SystemSettings.Sbase / base_mva  # case base -> system base
+
+        # buses (isolated buses, type 4, are left out with everything connected to them)
+        bus = bus[bus[:, 1] != 4]
+        numbers = bus[:, 0].astype(int)
+        base_kv = np.where(bus[:, 9] > 0, bus[:, 9], 1.0)
+        bus_name = {n: f"Bus{n}" for n in numbers}
+        kv = dict(zip(numbers, base_kv))
+        circuit.add_bus_many([bus_name[n] for n in numbers], base_kv)
+
+        # branches: a branch is a transformer if it has an off-nominal tap, a phase shift or
+        # connects two voltage levels; everything else is a line
+        f, t = branch[:, 0].astype(int), branch[:, 1].astype(int)
+        in_service = (branch[:, 10] > 0) & np.isin(f, numbers) & np.isin(t, numbers)
+        branch, f, t = branch[in_service], f[in_service], t[in_service]
+        labels = np.flatnonzero(in_service) + 1
+        r, x, b = branch[:, 2] * scale, branch[:, 3] * scale, branch[:, 4] / scale
+        ratio, shift = branch[:, 8], branch[:, 9]
+        kv_from, kv_to = np.array([kv[n] for n in f]), np.array([kv[n] for n in t])
+        is_xfmr = ((ratio != 0) & (ratio != 1)) | (shift != 0) | (kv_from != kv_to)
+
+        lines = ~is_xfmr
+        circuit.add_tline_many([f"Line{k}" for k in labels[lines]], [bus_name[n] for n in f[lines]],
+                               [bus_name[n] for n in t[lines]], constants=(r[lines], x[lines], b[lines]))
+
+        # transformer R and X are given on the system base; with the rating as the transformer base,
+        # impedance_percent and X/R reproduce them exactly
+        rating = np.where(branch[is_xfmr, 5] > 0, branch[is_xfmr, 5], SystemSettings.Sbase)
+        r_x, x_x = r[is_xfmr], x[is_xfmr]
+        x_over_r = np.divide(x_x, r_x, out=np.copysign(np.full_like(x_x, np.inf), x_x), where=r_x > 0)
+        circuit.add_transformer_many([f"T{k}" for k in labels[is_xfmr]], [bus_name[n] for n in f[is_xfmr]],
+                                     [bus_name[n] for n in t[is_xfmr]], rating,
+                                     100 * np.hypot(r_x, x_x) * rating / SystemSettings.Sbase, x_over_r,
+                                     self.transformer_connection, self.grounding_impedance)
+
+        # generators: voltage setpoints in kV as in add_generator; the p.u. setpoint becomes the
+        # bus voltage the power flow holds at PV and slack buses
+        gen_bus = gen[:, 0].astype(int)
+        in_service = (gen[:, 7] > 0) & np.isin(gen_bus, numbers)
+        gen, gen_bus = gen[in_service], gen_bus[in_service]
+        circuit.add_generator_many([f"Gen{k}" for k in np.flatnonzero(in_service) + 1],
+                                   [bus_name[n] for n in gen_bus],
+                                   gen[:, 5] * np.array([kv[n] for n in gen_bus]), gen[:, 1],
+                                   self.grounding_impedance)
+        for n, vg in zip(gen_bus, gen[:, 5]):
+            circuit.buses[bus_name[n]].vpu = vg
+
+        gen_buses = set(gen_bus)
+        for n in numbers[bus[:, 1] == 3]:
+            if n in gen_buses:
+                circuit.set_slack_bus(bus_name[n])
+
+        # loads: one per bus with demand
+        has_load = (bus[:, 2] != 0) | (bus[:, 3] != 0)
+        circuit.add_load_many([f"Load{n}" for n in numbers[has_load]], [bus_name[n] for n in numbers[has_load]],
+                              bus[has_load, 2], bus[has_load, 3])
+
+        return circuit
@@ -18,6 +18,25 @@ from TransmissionLine import TransmissionLine
 from Transformer import Transformer
 from Generator import Generator
 from Load import Load
+from YbusBuilder import YbusBuilder
+from NetworkModel import NetworkModel
+from LineConstants import LineConstants
+from DCPowerFlow import DCPowerFlow
+from ZbusSolver import ZbusSolver
+
+# derived data kept by a Circuit, by the kind of change that makes it stale; the bus matrices
+# themselves are not listed, they are kept current by stamp deltas
+ALL_DERIVED = ("model", "zbus_pos", "zbus_neg", "zbus_zero", "dc")
+DEPENDENTS = {
+    Bus: ALL_DERIVED,
+    TransmissionLine: ALL_DERIVED,
+    Transformer: ALL_DERIVED,
+    Generator: ("model", "zbus_pos", "zbus_neg", "zbus_zero"),  # the DC B matrix has branches only
+    Load: ("model", "zbus_pos", "zbus_neg"),  # loads are not part of the zero-sequence network
+}
+SLACK_DEPENDENTS = ("model", "dc")
+SEQUENCE_ZBUSES = ("zbus_pos", "zbus_neg", "zbus_zero")
+
 class Circuit:
 
     def __init__(self, name: str):
@@ -31,12 +50,43 @@ class Circuit:
         self.generators: Dict[str, Generator] = {}
         self.loads: Dict[str, Load] = {}
 
+        self.bus_index: Dict[str, int] = {}  # bus name -> row/column in the bus matrices
+
+        self.line_constants = LineConstants()  # memoized DSL/DSC/Deq per line configuration
         self.slack_bus = None
-        self.ybus = self.calc_ybus()
-        self.ybus_pos = self.calc_ybus_pos_sequence()
-        self.ybus_neg = self.calc_ybus_neg_sequence()
-        self.ybus_zero = self.calc_ybus_zero_sequence()
-        self.zbus_pos, self.zbus_neg, self.zbus_zero = self.calc_sequence_zbuses()
+
+        # nothing is built until it is first asked for (ybus, zbus_pos, ... are properties)
+        self._network_matrices = None  # (ybus, pos, neg, zero), kept current by element stamp deltas
+        self._pending_stamps = []  # element stamps not yet applied to the network matrices
+        self._derived = {}  # name in ALL_DERIVED -> network model, sequence Zbus or DC power flow
+
+    @property
+    def ybus(self):
+        return self.calc_network_matrices()[0]
+
+    @property
+    def ybus_pos(self):
+        return self.calc_network_matrices()[1]
+
+    @property
+    def ybus_neg(self):
+        return self.calc_network_matrices()[2]
+
+    @property
+    def ybus_zero(self):
+        return self.calc_network_matrices()[3]
+
+    @property
+    def zbus_pos(self):
+        return self.calc_sequence_zbuses()[0]
+
+    @property
+    def zbus_neg(self):
+        return self.calc_sequence_zbuses()[1]
+
+    @property
+    def zbus_zero(self):
+        return self.calc_sequence_zbuses()[2]
 
 
     def add_bus(self, bus: str, base_kv: float):
@@ -45,7 +95,36 @@ class Circuit:
 
         if bus in self.buses:
             raise ValueError(f"Bus '{bus}' already exists.")
-        self.buses[bus] = Bus(bus, base_kv)
+        self.bus_index[bus] = len(self.buses)
+        self.buses[bus] = Bus(bus, base_kv, self.bus_index[bus])
+        self.invalidate(*DEPENDENTS[Bus])
+
+    def add_bus_many(self, buses, base_kvs):
+
+        # add a whole table of buses at once
+
+        buses = self.check_new_names(buses, self.buses, "Bus")
+        for bus, base_kv in zip(buses, base_kvs):
+            self.bus_index[bus] = len(self.buses)
+            self.buses[bus] = Bus(bus, float(base_kv), self.bus_index[bus])
+        self.invalidate(*DEPENDENTS[Bus])
+
+    def check_new_names(self, names, existing: dict, kind: str):
+        # bulk adds: every name must be unique and not yet in the circuit
+        names = list(names)
+        if len(set(names)) != len(names):
+            raise ValueError(f"{kind} names must be unique.")
+        for name in names:
+            if name in existing:
+                raise ValueError(f"{kind} '{name}' already exists.")
+        return names
+
+    def check_buses(self, bus_names):
+        bus_names = list(bus_names)
+        for bus_name in set(bus_names):
+            if bus_name not in self.buses:
+                raise ValueError(f"Bus '{bus_name}' does not exist in the circuit.")
+        return bus_names
 
     def add_transformer(self, name: str, bus1_name: str, bus2_name: str, power_rating: float,
                         impedance_percent: float, x_over_r_ratio: float, connection_type: str, grounding_impedance: float):
@@ -63,6 +142,26 @@ class Circuit:
         bus2 = self.buses[bus2_name]
 
         self.transformers[name] = Transformer(name, bus1, bus2, power_rating, impedance_percent, x_over_r_ratio, connection_type, grounding_impedance)
+        self.stamp_element(self.transformers[name], 1)
+
+    def add_transformer_many(self, names, bus1_names, bus2_names, power_ratings, impedance_percents,
+                             x_over_r_ratios, connection_types, grounding_impedances):
+
+        # add a whole table of transformers at once; connection_types and grounding_impedances
+        # may be single values shared by every transformer
+
+        names = self.check_new_names(names, self.transformers, "Transformer")
+        bus1_names, bus2_names = self.check_buses(bus1_names), self.check_buses(bus2_names)
+        M = len(names)
+        if isinstance(connection_types, str):
+            connection_types = [connection_types] * M
+        grounding_impedances = np.broadcast_to(np.asarray(grounding_impedances, dtype=float), (M,))
+
+        xfmrs = [Transformer(name, self.buses[bus1_names[k]], self.buses[bus2_names[k]], power_ratings[k],
+                             impedance_percents[k], x_over_r_ratios[k], connection_types[k], grounding_impedances[k])
+                 for k, name in enumerate(names)]
+        self.transformers.update(zip(names, xfmrs))
+        self.stamp_elements(xfmrs, 1)
 
     def add_conductor(self, name: str, diam: float, gmr: float, resistance: float, ampacity: float):
 
@@ -113,6 +212,44 @@ class Circuit:
         geometry = self.geometries[geometry_name]
 
         self.transmissionlines[name] = TransmissionLine(name, bus1, bus2, bundle, geometry, length)
+        self.stamp_element(self.transmissionlines[name], 1)
+
+    def add_tline_many(self, names, bus1_names, bus2_names, bundle_names=None, geometry_names=None, lengths=None,
+                       constants=None):
+
+        # adds many Transmission Lines at once; R, X and B of all of them are computed in one
+        # vectorized pass instead of line by line
+        # constants: (Rpu, Xpu, Bpu) arrays for lines given by impedance (case files) instead of
+        # by bundle, geometry and length
+
+        names = self.check_new_names(names, self.transmissionlines, "Transmission Line")
+        bus1_names, bus2_names = self.check_buses(bus1_names), self.check_buses(bus2_names)
+        M = len(names)
+
+        if constants is None:
+            bundle_names, geometry_names = list(bundle_names), list(geometry_names)
+            for bundle_name in set(bundle_names):
+                if bundle_name not in self.bundles:
+                    raise ValueError(f"Bundle '{bundle_name}' not found.")
+            for geometry_name in set(geometry_names):
+                if geometry_name not in self.geometries:
+                    raise ValueError(f"Geometry '{geometry_name}' not found.")
+
+            bundles = [self.bundles[b] for b in bundle_names]
+            geometries = [self.geometries[g] for g in geometry_names]
+            lengths = np.asarray(lengths, dtype=float)
+            base_kv = [self.buses[b].base_kv for b in bus2_names]
+            constants = self.line_constants.calc(bundles, geometries, lengths, base_kv)
+        else:
+            bundles = geometries = [None] * M
+            lengths = np.zeros(M) if lengths is None else np.asarray(lengths, dtype=float)
+
+        Rpu, Xpu, Bpu = constants
+        lines = [TransmissionLine(name, self.buses[bus1_names[k]], self.buses[bus2_names[k]], bundles[k],
+                                  geometries[k], lengths[k], constants=(Rpu[k], Xpu[k], Bpu[k]))
+                 for k, name in enumerate(names)]
+        self.transmissionlines.update(zip(names, lines))
+        self.stamp_elements(lines, 1)
 
     def add_generator(self, name: str, bus: Bus, voltage_setpoint: float, mw_setpoint: float, grounding_impedance: float, is_grounded: bool = True):
 
@@ -128,10 +265,38 @@ class Circuit:
         if len(self.generators) == 0:
             self.slack_bus = bus
             bus_obj.bus_type = "Slack Bus"
+            self.invalidate(*SLACK_DEPENDENTS)
         else:
             bus_obj.bus_type = "PV Bus"
 
         self.generators[name] = Generator(name, bus_obj, voltage_setpoint, mw_setpoint, grounding_impedance, is_grounded)
+        self.stamp_element(self.generators[name], 1)
+
+    def add_generator_many(self, names, bus_names, voltage_setpoints, mw_setpoints, grounding_impedances,
+                           is_grounded=True):
+
+        # add a whole table of generators at once; as with add_generator, the first generator of
+        # the circuit makes its bus the slack bus and every other generator bus becomes a PV bus
+
+        names = self.check_new_names(names, self.generators, "Generator")
+        bus_names = self.check_buses(bus_names)
+        M = len(names)
+        grounding_impedances = np.broadcast_to(np.asarray(grounding_impedances, dtype=float), (M,))
+        is_grounded = np.broadcast_to(np.asarray(is_grounded, dtype=bool), (M,))
+
+        gens = []
+        for k, name in enumerate(names):
+            bus_obj = self.buses[bus_names[k]]
+            if self.slack_bus is None and len(self.generators) == 0 and k == 0:
+                self.slack_bus = bus_obj.name
+                bus_obj.bus_type = "Slack Bus"
+                self.invalidate(*SLACK_DEPENDENTS)
+            elif bus_obj.name != self.slack_bus:
+                bus_obj.bus_type = "PV Bus"
+            gens.append(Generator(name, bus_obj, voltage_setpoints[k], mw_setpoints[k], grounding_impedances[k],
+                                  bool(is_grounded[k])))
+        self.generators.update(zip(names, gens))
+        self.stamp_elements(gens, 1)
 
     def set_slack_bus(self, bus_name: str):
         if bus_name not in self.buses:
@@ -146,6 +311,7 @@ class Circuit:
         # Set the new slack bus
         self.slack_bus = bus_name
         self.buses[bus_name].bus_type = "Slack Bus"
+        self.invalidate(*SLACK_DEPENDENTS)  # bus types and the reduced B matrix depend on the slack bus
 
     def add_load(self, name: str, bus: str, real_power: float, reactive_power: float):
 
@@ -154,139 +320,295 @@ class Circuit:
         if name in self.loads:
             raise ValueError(f"Load '{name}' already exists.")
         self.loads[name] = Load(name, self.buses[bus], real_power, reactive_power)
+        self.stamp_element(self.loads[name], 1)
 
-    def calc_ybus(self):
-        busnames = list(self.buses.keys())
-        N = len(busnames)
-        ybus = pd.DataFrame(np.zeros((N, N), dtype=complex), index=busnames, columns=busnames)
+    def add_load_many(self, names, bus_names, real_powers, reactive_powers):
+
+        # add a whole table of loads at once
 
-        for line in self.transmissionlines.values():
-            b1, b2 = line.bus1.name, line.bus2.name
-            y = line.yprim
-            ybus.loc[b1, b1] += y.loc[b1, b1]
-            ybus.loc[b2, b2] += y.loc[b2, b2]
-            ybus.loc[b1, b2] += y.loc[b1, b2]
-            ybus.loc[b2, b1] += y.loc[b2, b1]
+        names = self.check_new_names(names, self.loads, "Load")
+        bus_names = self.check_buses(bus_names)
+        loads = [Load(name, self.buses[bus_names[k]], real_powers[k], reactive_powers[k])
+                 for k, name in enumerate(names)]
+        self.loads.update(zip(names, loads))
+        self.stamp_elements(loads, 1)
 
-        for xfmr in self.transformers.values():
-            b1, b2 = xfmr.bus1.name, xfmr.bus2.name
-            y = xfmr.yprim
-            ybus.loc[b1, b1] += y.loc[b1, b1]
-            ybus.loc[b2, b2] += y.loc[b2, b2]
-            ybus.loc[b1, b2] += y.loc[b1, b2]
-            ybus.loc[b2, b1] += y.loc[b2, b1]
+    def remove_tline(self, name: str):
 
+        # take a transmission line out of service and remove its stamp from the bus matrices
 
-        self.ybus = ybus
-        return ybus
+        if name not in self.transmissionlines:
+            raise ValueError(f"Transmission Line '{name}' does not exist in the circuit.")
+        line = self.transmissionlines.pop(name)
+        self.stamp_element(line, -1)
+        return line
 
+    def remove_transformer(self, name: str):
+
+        # take a transformer out of service
+
+        if name not in self.transformers:
+            raise ValueError(f"Transformer '{name}' does not exist in the circuit.")
+        xfmr = self.transformers.pop(name)
+        self.stamp_element(xfmr, -1)
+        return xfmr
+
+    def remove_generator(self, name: str):
+
+        # take a generator out of service; its bus becomes a PQ bus if no other generator is
+        # connected, and the slack moves to the next generator if it was on this bus
+
+        if name not in self.generators:
+            raise ValueError(f"Generator '{name}' does not exist in the circuit.")
+        gen = self.generators.pop(name)
+        self.stamp_element(gen, -1)
+
+        bus_name = gen.bus.name
+        if bus_name not in [g.bus.name for g in self.generators.values()]:
+            gen.bus.bus_type = "PQ Bus"
+            if self.slack_bus == bus_name:
+                self.slack_bus = None
+                self.invalidate(*SLACK_DEPENDENTS)
+                if self.generators:
+                    self.set_slack_bus(next(iter(self.generators.values())).bus.name)
+        return gen
+
+    def remove_load(self, name: str):
+
+        # disconnect a load
+
+        if name not in self.loads:
+            raise ValueError(f"Load '{name}' does not exist in the circuit.")
+        load = self.loads.pop(name)
+        self.stamp_element(load, -1)
+        return load
+
+    def update_tline(self, name: str, bundle_name: str = None, geometry_name: str = None, length: float = None,
+                     Rpu: float = None, Xpu: float = None, Bpu: float = None):
+
+        # re-parameterize a transmission line; only the change in its stamp is applied
+        # Rpu, Xpu, Bpu set the impedance directly (the others keep their values), which makes the
+        # line impedance-defined like the lines of an imported case; those lines have no bundle or
+        # geometry, so they can only be updated this way
+
+        if name not in self.transmissionlines:
+            raise ValueError(f"Transmission Line '{name}' does not exist in the circuit.")
+        if bundle_name is not None and bundle_name not in self.bundles:
+            raise ValueError(f"Bundle '{bundle_name}' not found.")
+        if geometry_name is not None and geometry_name not in self.geometries:
+            raise ValueError(f"Geometry '{geometry_name}' not found.")
+
+        old = self.transmissionlines[name]
+        length = length if length is not None else old.length
+
+        if Rpu is not None or Xpu is not None or Bpu is not None:
+            if bundle_name is not None or geometry_name is not None:
+                raise ValueError("Give either a bundle and geometry or Rpu, Xpu and Bpu, not both.")
+            constants = (Rpu if Rpu is not None else old.Rpu, Xpu if Xpu is not None else old.Xpu,
+                         Bpu if Bpu is not None else old.Bpu)
+            self.replace_element(self.transmissionlines, name, TransmissionLine(
+                name, old.bus1, old.bus2, None, None, length, constants=constants))
+            return
+
+        bundle = self.bundles[bundle_name] if bundle_name is not None else old.bundle
+        geometry = self.geometries[geometry_name] if geometry_name is not None else old.geometry
+        if bundle is None or geometry is None:
+            raise ValueError(f"Transmission Line '{name}' is defined by its impedance; "
+                             f"update it with Rpu, Xpu and Bpu or give both a bundle and a geometry.")
+        if length <= 0:
+            raise ValueError(f"Transmission Line '{name}' needs a positive length to be built from a bundle and geometry.")
+
+        self.replace_element(self.transmissionlines, name,
+                             TransmissionLine(name, old.bus1, old.bus2, bundle, geometry, length))
+
+    def update_transformer(self, name: str, power_rating: float = None, impedance_percent: float = None,
+                           x_over_r_ratio: float = None, connection_type: str = None, grounding_impedance: float = None):
+
+        # re-parameterize a transformer
+
+        if name not in self.transformers:
+            raise ValueError(f"Transformer '{name}' does not exist in the circuit.")
+
+        old = self.transformers[name]
+        self.replace_element(self.transformers, name, Transformer(
+            name, old.bus1, old.bus2,
+            power_rating if power_rating is not None else old.power_rating,
+            impedance_percent if impedance_percent is not None else old.impedance_percent,
+            x_over_r_ratio if x_over_r_ratio is not None else old.x_over_r_ratio,
+            connection_type if connection_type is not None else old.connection_type,
+            grounding_impedance if grounding_impedance is not None else old.Zn))
+
+    def update_generator(self, name: str, voltage_setpoint: float = None, mw_setpoint: float = None,
+                         grounding_impedance: float = None, is_grounded: bool = None):
+
+        # change generator setpoints or grounding
+
+        if name not in self.generators:
+            raise ValueError(f"Generator '{name}' does not exist in the circuit.")
+
+        old = self.generators[name]
+        self.replace_element(self.generators, name, Generator(
+            name, old.bus,
+            voltage_setpoint if voltage_setpoint is not None else old.voltage_setpoint,
+            mw_setpoint if mw_setpoint is not None else old.mw_setpoint,
+            grounding_impedance if grounding_impedance is not None else old.Zn,
+            is_grounded if is_grounded is not None else old.is_grounded))
+
+    def update_load(self, name: str, real_power: float = None, reactive_power: float = None):
+
+        # change a load's MW / MVAR demand
+
+        if name not in self.loads:
+            raise ValueError(f"Load '{name}' does not exist in the circuit.")
+
+        old = self.loads[name]
+        self.replace_element(self.loads, name, Load(
+            name, old.bus,
+            real_power if real_power is not None else old.real_power,
+            reactive_power if reactive_power is not None else old.reactive_power))
+
+    def replace_element(self, elements: dict, name: str, new_element):
+        # an update that leaves the element's admittances as they were (e.g. a generator setpoint)
+        # only makes the network model stale, not the bus matrices or their factorizations
+        builder = YbusBuilder(self)
+        if np.array_equal(builder.element_stamps(elements[name])[2], builder.element_stamps(new_element)[2]):
+            elements[name] = new_element
+            self.invalidate("model")
+            return
+
+        self.stamp_element(elements[name], -1)
+        elements[name] = new_element
+        self.stamp_element(new_element, 1)
+
+    def stamp_element(self, element, sign: int):
+        # queue the element's stamp (sign=1 to add it, sign=-1 to remove it); the queue is applied
+        # to the bus matrices the next time they are requested, so nothing is rebuilt from scratch
+        if self._network_matrices is not None:
+            rows, cols, vals = YbusBuilder(self).element_stamps(element)
+            self._pending_stamps.append((rows, cols, sign * vals))
+        self.invalidate(*DEPENDENTS[type(element)])
+
+    def stamp_elements(self, elements, sign: int):
+        # one queued stamp for a whole batch of elements (bulk adds)
+        if self._network_matrices is not None and elements:
+            builder = YbusBuilder(self)
+            stamps = [builder.element_stamps(element) for element in elements]
+            self._pending_stamps.append((np.concatenate([s[0] for s in stamps]), np.concatenate([s[1] for s in stamps]),
+                                         sign * np.concatenate([s[2] for s in stamps], axis=1)))
+        if elements:
+            self.invalidate(*DEPENDENTS[type(elements[0])])
+
+    def calc_network_matrices(self):
+        # (ybus, pos, neg, zero): assembled in one sweep the first time, afterwards kept
+        # current by adding the stamp deltas of elements added, removed or changed since
+
+        builder = YbusBuilder(self)
+        if self._network_matrices is None:
+            self._network_matrices = builder.build_network_matrices()
+            self._pending_stamps = []
+        elif self._pending_stamps or self._network_matrices[0].shape[0] != builder.N:
+            self._network_matrices = builder.apply_stamps(self._network_matrices, self._pending_stamps)
+            self._pending_stamps = []
+
+        return self._network_matrices
+
+    def calc_ybus(self):
+        # power flow Ybus (lines and transformers) as a sparse CSR matrix
+        return self.calc_network_matrices()[0]
+
+    def calc_sequence_networks(self):
+        # positive, negative and zero-sequence Ybus matrices
+        return tuple(self.calc_network_matrices()[1:])
+
+    def reset_network_matrices(self):
+        # drops the assembled bus matrices and everything derived from them, so the next use
+        # assembles them again from the elements in one sweep
+        self._network_matrices = None
+        self._pending_stamps = []
+        self.invalidate_cached_matrices()
+
+    def set_network_matrices(self, matrices, sequence_zbuses=None):
+        # installs already assembled (ybus, pos, neg, zero) matrices, and optionally the three
+        # sequence Zbus solvers built on them, in place of assembling them from the elements
+        # (used when loading a snapshot); all other derived data is rebuilt on demand
+        self._network_matrices = tuple(matrices)
+        self._pending_stamps = []
+        self.invalidate_cached_matrices()
+        if sequence_zbuses is not None:
+            self._derived.update(zip(SEQUENCE_ZBUSES, sequence_zbuses))
+
+    def invalidate(self, *names):
+        # marks derived data (names from ALL_DERIVED) stale; it is rebuilt the next time it is used
+        for name in names:
+            self._derived.pop(name, None)
+
+    def invalidate_cached_matrices(self):
+        # everything derived from the bus matrices (which cannot be updated incrementally) is dropped
+        self.invalidate(*ALL_DERIVED)
+
+    def calc_network_model(self):
+        # array-backed model (bus types, branch from/to and impedances, injections) compiled from
+        # the element objects on first use and kept until the circuit changes
+        if "model" not in self._derived:
+            self._derived["model"] = NetworkModel(self)
+        return self._derived["model"]
+
+    def __getstate__(self):
+        # SuperLU factorizations cannot be pickled; worker processes refactorize on demand
+        state = self.__dict__.copy()
+        state["_derived"] = {name: value for name, value in self._derived.items()
+                             if name not in SEQUENCE_ZBUSES and name != "dc"}
+        return state
+
+    def save_snapshot(self, path: str, include_factors: bool = False):
+        # binary NPZ snapshot of the elements and bus matrices, see CircuitSnapshot.save for when
+        # include_factors helps
+        from CircuitSnapshot import CircuitSnapshot
+        CircuitSnapshot.save(self, path, include_factors)
+
+    @classmethod
+    def load_snapshot(cls, path: str):
+        # Circuit rebuilt from a snapshot without running element constructors or Ybus assembly
+        from CircuitSnapshot import CircuitSnapshot
+        return CircuitSnapshot.load(path)
+
+    def calc_dc_power_flow(self):
+        # DC power flow model whose reduced B matrix is factorized once and kept
+        # until the network or the slack bus changes
+        if "dc" not in self._derived:
+            self._derived["dc"] = DCPowerFlow(self)
+        return self._derived["dc"]
 
     def calc_ybus_pos_sequence(self):
-        busnames = list(self.buses.keys())
-        N = len(busnames)
-        ybus_pos = pd.DataFrame(np.zeros((N, N), dtype=complex), index=busnames, columns=busnames)
-
-        for line in self.transmissionlines.values():
-            b1, b2 = line.bus1.name, line.bus2.name
-            y = line.yprim
-            ybus_pos.loc[b1, b1] += y.loc[b1, b1]
-            ybus_pos.loc[b2, b2] += y.loc[b2, b2]
-            ybus_pos.loc[b1, b2] += y.loc[b1, b2]
-            ybus_pos.loc[b2, b1] += y.loc[b2, b1]
-
-        for xfmr in self.transformers.values():
-            b1, b2 = xfmr.bus1.name, xfmr.bus2.name
-            y = xfmr.yprim
-            ybus_pos.loc[b1, b1] += y.loc[b1, b1]
-            ybus_pos.loc[b2, b2] += y.loc[b2, b2]
-            ybus_pos.loc[b1, b2] += y.loc[b1, b2]
-            ybus_pos.loc[b2, b1] += y.loc[b2, b1]
-
-        for gen in self.generators.values():
-            b = gen.bus.name
-            ybus_pos.loc[b, b] += gen.y_prim_positive_sequence().loc[b, b]
-
-        for load in self.loads.values():
-            b = load.bus.name
-            ybus_pos.loc[b, b] += load.y_prim().loc[b, b]
-
-        self.ybus_pos = ybus_pos
-        return ybus_pos
+        return self.calc_sequence_networks()[0]
 
     def calc_ybus_neg_sequence(self):
-        busnames = list(self.buses.keys())
-        N = len(busnames)
-        ybus_neg = pd.DataFrame(np.zeros((N, N), dtype=complex), index=busnames, columns=busnames)
-
-        for line in self.transmissionlines.values():
-            b1, b2 = line.bus1.name, line.bus2.name
-            y = line.yprim_neg
-            ybus_neg.loc[b1, b1] += y.loc[b1, b1]
-            ybus_neg.loc[b2, b2] += y.loc[b2, b2]
-            ybus_neg.loc[b1, b2] += y.loc[b1, b2]
-            ybus_neg.loc[b2, b1] += y.loc[b2, b1]
-
-        for xfmr in self.transformers.values():
-            b1, b2 = xfmr.bus1.name, xfmr.bus2.name
-            y = xfmr.yprim_neg
-            ybus_neg.loc[b1, b1] += y.loc[b1, b1]
-            ybus_neg.loc[b2, b2] += y.loc[b2, b2]
-            ybus_neg.loc[b1, b2] += y.loc[b1, b2]
-            ybus_neg.loc[b2, b1] += y.loc[b2, b1]
-
-        for gen in self.generators.values():
-            b = gen.bus.name
-            ybus_neg.loc[b, b] += gen.y_prim_negative_sequence().loc[b, b]
-
-        for load in self.loads.values():
-            b = load.bus.name
-            ybus_neg.loc[b, b] += load.y_prim().loc[b, b]
-
-        self.ybus_neg = ybus_neg
-        return ybus_neg
+        return self.calc_sequence_networks()[1]
 
     def calc_ybus_zero_sequence(self):
-        busnames = list(self.buses.keys())
-        N = len(busnames)
-        ybus_zero = pd.DataFrame(np.zeros((N, N), dtype=complex), index=busnames, columns=busnames)
-
-        for line in self.transmissionlines.values():
-            b1, b2 = line.bus1.name, line.bus2.name
-            y = line.yprim_zero
-            ybus_zero.loc[b1, b1] += y.loc[b1, b1]
-            ybus_zero.loc[b2, b2] += y.loc[b2, b2]
-            ybus_zero.loc[b1, b2] += y.loc[b1, b2]
-            ybus_zero.loc[b2, b1] += y.loc[b2, b1]
-
-        for xfmr in self.transformers.values():
-            b1, b2 = xfmr.bus1.name, xfmr.bus2.name
-            y = xfmr.yprim_zero
-            ybus_zero.loc[b1, b1] += y.loc[b1, b1]
-            ybus_zero.loc[b2, b2] += y.loc[b2, b2]
-            ybus_zero.loc[b1, b2] += y.loc[b1, b2]
-            ybus_zero.loc[b2, b1] += y.loc[b2, b1]
-
-        for gen in self.generators.values():
-            b = gen.bus.name
-            ybus_zero.loc[b, b] += gen.y_prim_zero_sequence().loc[b, b]
-
-
-        self.ybus_zero = ybus_zero
-        return ybus_zero
+        return self.calc_sequence_networks()[2]
+
+    def to_dataframe(self, matrix):
+        # labelled pandas view of a sparse bus matrix, only produced on request
+        return YbusBuilder(self).to_dataframe(matrix)
 
     def calc_sequence_zbuses(self):
-        busnames = list(self.buses.keys())  # DO NOT title-case them
+        # LU-factorized sequence networks; Zbus columns are solved on demand instead of
+        # inverting the Ybus matrices
+        # each sequence is factorized when first needed and kept until an element in that
+        # network changes (e.g. a new load refactorizes the positive and negative sequence only)
 
-        try:
-            self.zbus_pos = pd.DataFrame(np.linalg.inv(self.ybus_pos.values), index=busnames, columns=busnames)
-            self.zbus_neg = pd.DataFrame(np.linalg.inv(self.ybus_neg.values), index=busnames, columns=busnames)
-            self.zbus_zero = pd.DataFrame(np.linalg.inv(self.ybus_zero.values), index=busnames, columns=busnames)
+        missing = [name for name in SEQUENCE_ZBUSES if name not in self._derived]
+        if missing:
+            matrices = dict(zip(SEQUENCE_ZBUSES, self.calc_sequence_networks()))
+            try:
+                for name in missing:
+                    self._derived[name] = ZbusSolver(matrices[name], self.bus_index)
+            except RuntimeError:
+                print("One of the Ybus matrices is singular and cannot be inverted.")
+                return None, None, None
 
-            return self.zbus_pos, self.zbus_neg, self.zbus_zero
-        except np.linalg.LinAlgError:
-            print("One of the Ybus matrices is singular and cannot be inverted.")
-            self.zbus_pos = self.zbus_neg = self.zbus_zero = None
-            return None, None, None
+        return tuple(self._derived[name] for name in SEQUENCE_ZBUSES)
 
 
 if __name__ == "__main__":
@@ -333,19 +655,17 @@ if __name__ == "__main__":
 
         # YBUS CHECK
         circuit1.calc_ybus()
-        circuit1.calc_ybus_pos_sequence()
-        circuit1.calc_ybus_neg_sequence()
-        circuit1.calc_ybus_zero_sequence()
+        circuit1.calc_sequence_networks()
         circuit1.calc_sequence_zbuses()
 
         # Recalculate all sequence Ybuses and Zbuses
-        print("Ybus:\n", circuit1.ybus)
+        print("Ybus:\n", circuit1.to_dataframe(circuit1.ybus))
 
-        print("Ybus Positive Sequence:\n", circuit1.ybus_pos)
-        print("\nYbus Negative Sequence:\n", circuit1.ybus_neg)
-        print("\nYbus Zero Sequence:\n", circuit1.ybus_zero)
+        print("Ybus Positive Sequence:\n", circuit1.to_dataframe(circuit1.ybus_pos))
+        print("\nYbus Negative Sequence:\n", circuit1.to_dataframe(circuit1.ybus_neg))
+        print("\nYbus Zero Sequence:\n", circuit1.to_dataframe(circuit1.ybus_zero))
 
 
-        print("\nZbus Positive Sequence:\n", circuit1.zbus_pos)
-        print("\nZbus Negaitve Sequence:\n", circuit1.zbus_neg)
-        print("\nZbus Zero Sequence:\n", circuit1.zbus_zero)
+        print("\nZbus Positive Sequence:\n", circuit1.zbus_pos.to_dataframe())
+        print("\nZbus Negaitve Sequence:\n", circuit1.zbus_neg.to_dataframe())
+        print("\nZbus Zero Sequence:\n", circuit1.zbus_zero.to_dataframe())
@@ -0,0 +1,192 @@
+# Group 8 - Project 2
+# ECE 2774
+# N-1 Contingency Analysis
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from Solution import Solution
+from SystemSettings import SystemSettings
+from YbusBuilder import YbusBuilder
+
+# per-process state of a worker, filled in once by init_worker
+worker_state = {}
+
+
+def init_worker(analysis):
+    worker_state["analysis"] = analysis
+
+
+def solve_worker_chunk(chunk):
+    analysis = worker_state["analysis"]
+    return [(outage, analysis.solve_outage(outage)) for outage in chunk]
+
+
+class ContingencyAnalysis:
+
+    def __init__(self, circuit, v_min: float = 0.95, v_max: float = 1.05, tolerance: float = 0.001,
+                 max_iterations: int = 20, max_workers: int = None, step_control: str = None,
+                 divergence_limit: float = 1e4, stall_iterations: int = 10):
+        # solves the base case once; every outage case starts from its voltages and from the base
+        # Ybus minus the stamp of the outaged branch, so nothing is rebuilt per case
+        # step_control is passed to Newton-Raphson for every case ("iwamoto" or "line_search" help
+        # heavily loaded cases converge); it is off by default because a damped step does not stop
+        # an outage that splits the grid any sooner than the full step's divergence tests do
+        # divergence_limit and stall_iterations (see Solution.newton_raphson) stop an outage case
+        # that is not converging before it uses all of max_iterations
+        self.circuit = circuit
+        self.v_min = v_min
+        self.v_max = v_max
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.max_workers = max_workers or os.cpu_count()
+        self.step_control = step_control
+        self.divergence_limit = divergence_limit
+        self.stall_iterations = stall_iterations
+
+        builder = YbusBuilder(circuit)
+        self.bus_names = builder.bus_names
+        self.branches = ([("line", name, line) for name, line in circuit.transmissionlines.items()]
+                         + [("transformer", name, xfmr) for name, xfmr in circuit.transformers.items()])
+        self.from_bus, self.to_bus, r, x, b = builder.branch_parameters()
+        self.yseries = 1 / (r + 1j * x)
+        self.yshunt = 1j * b / 2
+        self.ratings = self.calc_branch_ratings()
+        # keyed by (kind, name): a line and a transformer may share a name
+        self.branch_position = {(kind, name): k for k, (kind, name, _) in enumerate(self.branches)}
+        self.outage_stamps = {(kind, name): builder.element_stamps(element) for kind, name, element in self.branches}
+
+        self.base_ybus = circuit.calc_ybus()
+        base = Solution(circuit)
+        if not base.power_flow(tolerance, max_iterations, sparse=True, verbose=False, step_control=step_control):
+            raise ValueError("Base case power flow did not converge.")
+        self.base_voltages, self.base_angles = base.voltages, base.angles
+        # violations already present with every branch in service, and their values keyed by
+        # (type, element, limit) so a low and a high voltage at the same bus stay apart; run()
+        # leaves out outage rows that are no worse than these
+        self.base_violations = self.check_limits(None, base.voltage_vector())
+        self.base_values = {(kind, element, limit): value for _, _, kind, element, value, limit in self.base_violations}
+
+    def calc_branch_ratings(self):
+        # thermal limit of each branch in MVA: conductor ampacity at the line voltage, or the
+        # transformer nameplate rating; lines given by impedance only (imported cases) are unrated
+        ratings = []
+        for kind, _, element in self.branches:
+            if kind == "line" and element.bundle is None:
+                ratings.append(np.inf)
+            elif kind == "line":
+                amps = element.bundle.conductor.ampacity * element.bundle.num_conductors
+                ratings.append(np.sqrt(3) * element.bus1.base_kv * amps / 1000)
+            else:
+                ratings.append(element.power_rating)
+        return np.array(ratings, dtype=float)
+
+    def calc_branch_flows(self, V):
+        # apparent power (MVA) entering each branch at its from and to ends
+        Vf, Vt = V[self.from_bus], V[self.to_bus]
+        I_from = self.yseries * (Vf - Vt) + self.yshunt * Vf
+        I_to = self.yseries * (Vt - Vf) + self.yshunt * Vt
+        return Vf * np.conj(I_from) * SystemSettings.Sbase, Vt * np.conj(I_to) * SystemSettings.Sbase
+
+    def check_limits(self, outage, V, outaged_branch=None):
+        # (outage kind, outage name, type, element, value, limit) for every bus voltage outside
+        # [v_min, v_max] and every in-service branch loaded past its rating; outage is a
+        # (kind, name) key, or None for the base case
+        kind, name = outage if outage is not None else (None, None)
+        violations = []
+        vm = np.abs(V)
+        for k in np.flatnonzero(vm < self.v_min):
+            violations.append((kind, name, "voltage", self.bus_names[k], vm[k], self.v_min))
+        for k in np.flatnonzero(vm > self.v_max):
+            violations.append((kind, name, "voltage", self.bus_names[k], vm[k], self.v_max))
+
+        S_from, S_to = self.calc_branch_flows(V)
+        loading = np.maximum(np.abs(S_from), np.abs(S_to))
+        overloaded = loading > self.ratings
+        if outaged_branch is not None:
+            overloaded[outaged_branch] = False
+        for k in np.flatnonzero(overloaded):
+            violations.append((kind, name, "flow", self.branches[k][1], loading[k], self.ratings[k]))
+
+        return violations
+
+    def outage_key(self, outage):
+        # (kind, name) of an outage given either as that key or as a branch name, which must then
+        # belong to only one line or transformer
+        if isinstance(outage, tuple):
+            if outage not in self.branch_position:
+                raise ValueError(f"Branch {outage} does not exist in the circuit.")
+            return outage
+        keys = [key for key in (("line", outage), ("transformer", outage)) if key in self.branch_position]
+        if len(keys) != 1:
+            raise ValueError(f"Branch '{outage}' " + ("does not exist in the circuit." if not keys else
+                                                      "names both a line and a transformer; give (kind, name)."))
+        return keys[0]
+
+    def solve_outage(self, outage):
+        # power flow with one branch out of service; Ybus changes by that branch's stamp only
+        # (a rank-one update), and NR is warm-started from the base case
+        outage = self.outage_key(outage)
+        rows, cols, vals = self.outage_stamps[outage]
+        ybus = (self.base_ybus - sp.coo_matrix((vals[0], (rows, cols)), shape=self.base_ybus.shape)).tocsr()
+
+        solution = Solution(self.circuit, ybus=ybus)
+        solution.warm_start(self.base_voltages, self.base_angles)
+        if not solution.power_flow(self.tolerance, self.max_iterations, sparse=True, verbose=False,
+                                   step_control=self.step_control, divergence_limit=self.divergence_limit,
+                                   stall_iterations=self.stall_iterations):
+            return [(*outage, "nonconvergence", None, np.nan, np.nan)]
+
+        return self.check_limits(outage, solution.voltage_vector(), self.branch_position[outage])
+
+    def iter_cases(self, outages=None, chunk_size: int = 8):
+        # yields ((kind, name), violations) for each outaged branch as cases finish, in completion
+        # order; outages are branch names or (kind, name) keys, all branches by default
+        # max_workers=1 solves them one after another in this process
+        outages = list(self.branch_position) if outages is None else [self.outage_key(o) for o in outages]
+
+        if self.max_workers == 1:
+            for outage in outages:
+                yield outage, self.solve_outage(outage)
+            return
+
+        chunks = [outages[i:i + chunk_size] for i in range(0, len(outages), chunk_size)]
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=init_worker,
+                                 initargs=(self,)) as pool:
+            futures = [pool.submit(solve_worker_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                yield from future.result()
+
+    def run(self, outages=None, chunk_size: int = 8, include_base_case: bool = False,
+            voltage_margin: float = 0.005, flow_margin: float = 0.01):
+        # every N-1 violation as one table with columns outage_kind (line or transformer), outage,
+        # type (voltage, flow or nonconvergence), element, value, limit, base_value (the value in
+        # the base case when the same limit is already violated there, else NaN) and base_case,
+        # which marks a violation the outage leaves about as it was: a voltage within
+        # voltage_margin p.u. of its base value or a flow within flow_margin times the rating;
+        # those rows are left out unless include_base_case, so the table shows what each outage
+        # makes worse
+        violations = [v for _, case in self.iter_cases(outages, chunk_size) for v in case]
+        table = pd.DataFrame(violations, columns=["outage_kind", "outage", "type", "element", "value", "limit"])
+        table["base_value"] = [self.base_values.get(key, np.nan)
+                               for key in zip(table["type"], table["element"], table["limit"])]
+
+        # how much further past its limit each violation is than in the base case
+        undervoltage = (table["type"] == "voltage") & (table["limit"] == self.v_min)
+        worse = np.where(undervoltage, table["base_value"] - table["value"],
+                         table["value"] - table["base_value"])
+        margin = np.where(table["type"] == "voltage", voltage_margin, flow_margin * table["limit"])
+        table["base_case"] = table["base_value"].notna() & (worse <= margin)
+        if not include_base_case:
+            table = table[~table["base_case"]].reset_index(drop=True)
+        return table
+
+    def base_case_table(self):
+        # the base case violations in the same columns as run()
+        table = pd.DataFrame(self.base_violations, columns=["outage_kind", "outage", "type", "element", "value",
+                                                            "limit"])
+        table["base_value"] = table["value"]
+        table["base_case"] = True
+        return table
@@ -0,0 +1,49 @@
+# Group 8 - Project 2
+# ECE 2774
+# DC Power Flow
+
+import numpy as np
+from SparseLU import SparseLU
+from SystemSettings import SystemSettings
+from YbusBuilder import YbusBuilder
+
+
+class DCPowerFlow:
+
+    def __init__(self, circuit):
+        # linear model P = B δ built from series reactances only; the reduced B (slack removed)
+        # is factorized once so every solve is a single forward/back substitution
+        if circuit.slack_bus is None:
+            raise ValueError("Circuit has no slack bus.")
+
+        self.circuit = circuit
+        builder = YbusBuilder(circuit)
+        self.bus_names = builder.bus_names
+        self.branch_names = list(circuit.transmissionlines.keys()) + list(circuit.transformers.keys())
+
+        self.from_bus, self.to_bus, _, self.x, _ = builder.branch_parameters()
+        self.slack = builder.bus_index[circuit.slack_bus]
+        self.non_slack = np.array([i for i in range(builder.N) if i != self.slack], dtype=int)
+
+        zeros = np.zeros_like(self.x)
+        B = -builder.assemble(builder.pi_model_triplets(self.from_bus, self.to_bus, zeros, self.x, zeros)).imag
+        self.lu = SparseLU().factorize(B[self.non_slack][:, self.non_slack])
+
+    def calc_injections(self):
+        # net injected MW per bus from generator setpoints and loads
+        return self.circuit.calc_network_model().calc_injections()[0] * SystemSettings.Sbase
+
+    def solve(self, p_injection=None):
+        # p_injection: net injected MW per bus in bus order, shape (N,) or (N, K) for K cases at once
+        # returns bus angles (radians) and branch MW flows (from-bus to to-bus)
+        if p_injection is None:
+            p_injection = self.calc_injections()
+        p_pu = np.asarray(p_injection, dtype=float) / SystemSettings.Sbase
+
+        angles = np.zeros(p_pu.shape)
+        angles[self.non_slack] = self.lu.solve(p_pu[self.non_slack])
+
+        x = self.x if angles.ndim == 1 else self.x[:, None]
+        flows = (angles[self.from_bus] - angles[self.to_bus]) / x * SystemSettings.Sbase
+
+        return angles, flows
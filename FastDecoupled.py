@@ -0,0 +1,44 @@
+# Group 8 - Project 2
+# ECE 2774
+# Fast Decoupled Load Flow
+
+import numpy as np
+from SparseLU import SparseLU
+from YbusBuilder import YbusBuilder
+
+
+class FastDecoupled:
+
+    def __init__(self, solution, variant: str = "XB"):
+        self.solution = solution
+        self.variant = variant.upper()
+        if self.variant not in ("XB", "BX"):
+            raise ValueError(f"Invalid fast decoupled variant: {variant}")
+
+        # B' and B'' are constant, so they are built and factorized once
+        self.b_prime, self.b_double_prime = self.calc_b_matrices()
+        self.lu_p = SparseLU().factorize(self.b_prime)
+        self.lu_q = SparseLU().factorize(self.b_double_prime) if len(solution.pq) > 0 else None
+
+    def calc_b_matrices(self):
+        # B' ignores line charging (and series resistance for XB), used for ΔP/V = B' Δδ
+        # B'' keeps line charging (and ignores series resistance for BX), used for ΔQ/V = B'' ΔV
+        builder = YbusBuilder(self.solution.circuit)
+        f, t, r, x, b = builder.branch_parameters()
+        pv_pq, pq = self.solution.pv_pq, self.solution.pq
+
+        r_prime = np.zeros_like(r) if self.variant == "XB" else r
+        r_double_prime = np.zeros_like(r) if self.variant == "BX" else r
+
+        b_prime = -builder.assemble(builder.pi_model_triplets(f, t, r_prime, x, np.zeros_like(b))).imag
+        b_double_prime = -builder.assemble(builder.pi_model_triplets(f, t, r_double_prime, x, b)).imag
+
+        return b_prime[pv_pq][:, pv_pq].tocsc(), b_double_prime[pq][:, pq].tocsc()
+
+    def calc_angle_update(self, delta_p, vm):
+        # Δδ = B'^-1 (ΔP / V), two triangular solves with the stored factors
+        return self.lu_p.solve(delta_p / vm[self.solution.pv_pq])
+
+    def calc_voltage_update(self, delta_q, vm):
+        # ΔV = B''^-1 (ΔQ / V)
+        return self.lu_q.solve(delta_q / vm[self.solution.pq])
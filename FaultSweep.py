@@ -0,0 +1,137 @@
+# Group 8 - Project 2
+# ECE 2774
+# Batch Fault Sweep
+
+import numpy as np
+import pandas as pd
+
+
+class FaultSweep:
+
+    FAULT_TYPES = ("3ph", "lg", "ll", "llg")  # three-phase, line-to-ground, line-to-line, double line-to-ground
+
+    def __init__(self, circuit, v_prefault: complex = 1.0 + 0.0j, Zf: complex = 0 + 0j):
+        zbuses = circuit.calc_sequence_zbuses()
+        if zbuses[0] is None:
+            raise ValueError("Sequence networks are singular; cannot run a fault sweep.")
+
+        self.setup(list(circuit.buses.keys()), zbuses, v_prefault, Zf)
+
+    @classmethod
+    def from_zbuses(cls, bus_names, zbuses, v_prefault: complex = 1.0 + 0.0j, Zf: complex = 0 + 0j):
+        # sweep over already factorized sequence networks, without a Circuit (used by worker processes)
+        sweep = cls.__new__(cls)
+        sweep.setup(bus_names, zbuses, v_prefault, Zf)
+        return sweep
+
+    def setup(self, bus_names, zbuses, v_prefault, Zf):
+        self.bus_names = list(bus_names)
+        self.bus_index = {name: idx for idx, name in enumerate(self.bus_names)}
+        self.zbus_pos, self.zbus_neg, self.zbus_zero = zbuses
+        self.v_prefault = v_prefault
+        self.Zf = Zf
+
+        a = np.exp(1j * 2 * np.pi / 3)
+        self.A = np.array([[1, 1, 1], [1, a ** 2, a], [1, a, a ** 2]])  # sequence -> phase
+
+    def calc_sequence_currents(self, fault_type, Z1_nn, Z2_nn, Z0_nn):
+        # I0, I1, I2 at each faulted bus; Z*_nn are arrays over the faulted buses
+        Vf, Zf = self.v_prefault, self.Zf
+        zeros = np.zeros_like(Z1_nn)
+
+        if fault_type == "3ph":
+            I1 = Vf / Z1_nn
+            return zeros, I1, zeros
+        elif fault_type == "lg":
+            I1 = Vf / (Z1_nn + Z2_nn + Z0_nn + 3 * Zf)
+            return I1, I1, I1
+        elif fault_type == "ll":
+            I1 = Vf / (Z1_nn + Z2_nn + Zf)
+            return zeros, I1, -I1
+        elif fault_type == "llg":
+            Z_sum = Z2_nn + Z0_nn + 3 * Zf
+            I1 = Vf / (Z1_nn + Z2_nn * (Z0_nn + 3 * Zf) / Z_sum)
+            return -I1 * Z2_nn / Z_sum, I1, -I1 * (Z0_nn + 3 * Zf) / Z_sum
+        else:
+            raise ValueError(f"Invalid fault type: {fault_type}")
+
+    def calc_fault_chunk(self, fault_idx, Z1, Z2, Z0, fault_types, include_voltages: bool = True):
+        # fault currents and post-fault phase voltages for the faulted buses fault_idx, given the
+        # matching Zbus columns Z1, Z2, Z0 of shape (N, len(fault_idx)); without include_voltages
+        # the (3, N, F) voltage arrays are never formed
+        cols = np.arange(len(fault_idx))
+        Z1_nn, Z2_nn, Z0_nn = Z1[fault_idx, cols], Z2[fault_idx, cols], Z0[fault_idx, cols]
+
+        currents, voltages = [], []
+        for fault_type in fault_types:
+            I0, I1, I2 = self.calc_sequence_currents(fault_type, Z1_nn, Z2_nn, Z0_nn)
+
+            I_abc = np.einsum("ps,sf->pf", self.A, np.stack((I0, I1, I2)))  # (3, F)
+            currents.append((fault_type, I_abc))
+            if not include_voltages:
+                continue
+
+            # V_k = V_prefault - Z_kn I_n for each sequence (no prefault negative/zero sequence)
+            V1 = self.v_prefault - Z1 * I1
+            V2 = -Z2 * I2
+            V0 = -Z0 * I0
+            V_abc = np.einsum("ps,skf->pkf", self.A, np.stack((V0, V1, V2)))  # (3, N, F)
+            voltages.append((fault_type, V_abc))
+
+        return currents, voltages
+
+    def iter_chunks(self, buses=None, fault_types=None, chunk_size: int = 256, include_voltages: bool = True):
+        # yields (currents, voltages) tables for chunk_size faulted buses at a time so memory stays
+        # bounded by N x chunk_size Zbus columns per sequence
+        buses = self.bus_names if buses is None else list(buses)
+
+        for start in range(0, len(buses), chunk_size):
+            yield self.sweep_chunk(buses[start:start + chunk_size], fault_types, include_voltages)
+
+    def sweep_chunk(self, chunk, fault_types=None, include_voltages: bool = True):
+        # (currents, voltages) tables for the faulted buses in chunk
+        fault_types = self.FAULT_TYPES if fault_types is None else tuple(fault_types)
+        fault_idx = np.array([self.bus_index[b] for b in chunk], dtype=int)
+
+        Z1 = self.zbus_pos.columns(chunk)
+        Z2 = self.zbus_neg.columns(chunk)
+        Z0 = self.zbus_zero.columns(chunk)
+
+        currents, voltages = self.calc_fault_chunk(fault_idx, Z1, Z2, Z0, fault_types, include_voltages)
+        return (self.currents_table(chunk, currents),
+                self.voltages_table(chunk, voltages) if include_voltages else None)
+
+    def run(self, buses=None, fault_types=None, chunk_size: int = 256, include_voltages: bool = True):
+        # all requested fault types at every bus in buses (default: all buses)
+        # returns (currents, voltages):
+        #   currents indexed by (fault_bus, fault_type) with complex Ia, Ib, Ic and the largest magnitude
+        #   voltages indexed by (fault_bus, fault_type, bus) with complex post-fault Va, Vb, Vc
+        chunks = list(self.iter_chunks(buses, fault_types, chunk_size, include_voltages))
+        currents = pd.concat([c for c, _ in chunks]) if chunks else self.currents_table([], [])
+        voltages = pd.concat([v for _, v in chunks]) if chunks and include_voltages else None
+        return currents, voltages
+
+    def currents_table(self, fault_buses, currents):
+        frames = []
+        for fault_type, I_abc in currents:
+            frames.append(pd.DataFrame({
+                "fault_bus": fault_buses, "fault_type": fault_type,
+                "Ia": I_abc[0], "Ib": I_abc[1], "Ic": I_abc[2],
+                "I_max": np.abs(I_abc).max(axis=0),
+            }))
+        if not frames:
+            return pd.DataFrame(columns=["Ia", "Ib", "Ic", "I_max"])
+        return pd.concat(frames).set_index(["fault_bus", "fault_type"])
+
+    def voltages_table(self, fault_buses, voltages):
+        N, F = len(self.bus_names), len(fault_buses)
+        frames = []
+        for fault_type, V_abc in voltages:
+            # V_abc[p, k, f] -> one row per (fault bus f, bus k)
+            frames.append(pd.DataFrame({
+                "fault_bus": np.repeat(np.asarray(fault_buses, dtype=object), N),
+                "fault_type": fault_type,
+                "bus": np.tile(np.asarray(self.bus_names, dtype=object), F),
+                "Va": V_abc[0].T.ravel(), "Vb": V_abc[1].T.ravel(), "Vc": V_abc[2].T.ravel(),
+            }))
+        return pd.concat(frames).set_index(["fault_bus", "fault_type", "bus"])
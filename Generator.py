@@ -8,6 +8,8 @@ import pandas as pd
 
 class Generator:
 
+    __slots__ = ("name", "bus", "voltage_setpoint", "mw_setpoint", "x1", "x2", "x0", "Zn", "is_grounded")
+
     def __init__(self,name: str, bus: Bus, voltage_setpoint: float, mw_setpoint: float, grounding_impedance: float, is_grounded: bool = True):
         self.name = name
         self.bus = bus
@@ -23,23 +25,19 @@ class Generator:
         self.Zn = grounding_impedance #default of zero which represents a solid ground - NEED TO MAKE IN PU
         self.is_grounded = is_grounded
 
-    def y_prim_positive_sequence(self):
+    def y_prim_positive_sequence(self) -> complex:
         # primitive admittance (Y = 1 / jX1) for the positive-sequence network
 
         Y = 1 / (1j * self.x1)
 
-        Yprim1 = pd.DataFrame([[Y]], index=[self.bus.name], columns=[self.bus.name])
-
-        return Yprim1
+        return Y
 
     def y_prim_negative_sequence(self) -> complex:
             # primitive admittance (Y = 1 / jX2) for the negative-sequence network.
 
             Y = 1 / (1j * self.x2)
 
-            Yprim2 = pd.DataFrame([[Y]], index=[self.bus.name], columns=[self.bus.name])
-
-            return Yprim2
+            return Y
 
     def y_prim_zero_sequence(self) -> complex:
         # primitive admittance (Y = 1 / (jX0 + 3*Zn)) for the zero-sequence network.
@@ -52,9 +50,11 @@ class Generator:
         if not self.is_grounded:
             Y = 0 + 0j
 
-        Yprim0 = pd.DataFrame([[Y]], index=[self.bus.name], columns=[self.bus.name])
+        return Y
 
-        return Yprim0
+    def to_dataframe(self, y: complex):
+        # labelled 1x1 view of a primitive admittance, only built for printing
+        return pd.DataFrame([[y]], index=[self.bus.name], columns=[self.bus.name])
 
 if __name__ == "__main__":
 
@@ -66,11 +66,11 @@ if __name__ == "__main__":
 
         print("\nGrounded Generator:")
         print("\nPositive Sequence Yprim:")
-        print(gen1.y_prim_positive_sequence())
+        print(gen1.to_dataframe(gen1.y_prim_positive_sequence()))
         print("\nNegative Sequence Yprim:")
-        print(gen1.y_prim_negative_sequence())
+        print(gen1.to_dataframe(gen1.y_prim_negative_sequence()))
         print("\nZero Sequence Yprim:")
-        print(gen1.y_prim_zero_sequence())
+        print(gen1.to_dataframe(gen1.y_prim_zero_sequence()))
 
 
         # Ungrounded generator
@@ -78,8 +78,8 @@ if __name__ == "__main__":
 
         print("\nUngrounded Generator:")
         print("\nPositive Sequence Yprim:")
-        print(gen2.y_prim_positive_sequence())
+        print(gen2.to_dataframe(gen2.y_prim_positive_sequence()))
         print("\nNegative Sequence Yprim:")
-        print(gen2.y_prim_negative_sequence())
+        print(gen2.to_dataframe(gen2.y_prim_negative_sequence()))
         print("\nZero Sequence Yprim:")
-        print(gen2.y_prim_zero_sequence())
+        print(gen2.to_dataframe(gen2.y_prim_zero_sequence()))
@@ -3,6 +3,7 @@
 # Jacobian
 
 import numpy as np
+import scipy.sparse as sp
 from Solution import Solution
 from Circuit import Circuit
 
@@ -10,110 +11,126 @@ from Circuit import Circuit
 class Jacobian:
     def __init__(self, solution):
         self.solution = solution
-        self.ybus = solution.ybus
-        self.voltages = solution.voltages
-        self.angles = solution.angles
+        self.ybus = solution.ybus  # sparse CSR Ybus
         self.buses = solution.circuit.buses
+        self.sparse_pattern = None  # CSC structure of J, built once from the Ybus pattern
 
-    def calc_j1(self, pv_pq_buses, all_bus):
-        sizep = len(pv_pq_buses)
-        J1 = np.zeros((sizep, sizep))
-        for i, bus_i in enumerate(pv_pq_buses):
-            vi = self.voltages[bus_i]
-            delta_i = self.angles[bus_i]
-            y_row = self.ybus.loc[bus_i]
-            for j, bus_j in enumerate(pv_pq_buses):
-                vj = self.voltages[bus_j]
-                delta_j = self.angles[bus_j]
-                yij = y_row[bus_j]
-                theta_ij = np.angle(yij)
-                if i == j:
-                    J1[i, j] = -vi * sum(self.voltages[b] * abs(y_row[b]) * np.sin(delta_i - self.angles[b] - np.angle(y_row[b]))
-                        for b in all_bus if b != bus_i)
-                else:
-                    J1[i, j] = vi * vj * abs(yij) * np.sin(delta_i - delta_j - theta_ij)
-        return J1
-
-    def calc_j2(self, pv_pq_buses, pq_buses, all_bus):
-        sizep = len(pv_pq_buses)
-        sizeq = len(pq_buses)
-        J2 = np.zeros((sizep, sizeq))
-        for i, bus_i in enumerate(pv_pq_buses):
-            vi = self.voltages[bus_i]
-            delta_i = self.angles[bus_i]
-            y_row = self.ybus.loc[bus_i]
-            for j, bus_j in enumerate(pq_buses):
-                vj = self.voltages[bus_j]
-                delta_j = self.angles[bus_j]
-                yij = y_row[bus_j]
-                theta_ij = np.angle(yij)
-                if bus_i == bus_j:
-                    J2[i, j] = sum(
-                        self.voltages[b] * abs(y_row[b]) *
-                        np.cos(delta_i - self.angles[b] - np.angle(y_row[b]))
-                        for b in all_bus) + vi * abs(y_row[bus_i]) * np.cos(np.angle(y_row[bus_i]))
-                else:
-                    J2[i, j] = vi * abs(y_row[bus_j]) * np.cos(delta_i - delta_j - theta_ij)
-        return J2
-
-    def calc_j3(self, pv_pq_buses, pq_buses, all_bus):
-        sizep = len(pv_pq_buses)
-        sizeq = len(pq_buses)
-        J3 = np.zeros((sizeq, sizep))
-        for i, bus_i in enumerate(pv_pq_buses):
-            if bus_i not in pq_buses:
-                continue
-            vi = self.voltages[bus_i]
-            delta_i = self.angles[bus_i]
-            y_row = self.ybus.loc[bus_i]
-            qi_idx = pq_buses.index(bus_i)
-            for j, bus_j in enumerate(pv_pq_buses):
-                vj = self.voltages[bus_j]
-                delta_j = self.angles[bus_j]
-                yij = y_row[bus_j]
-                theta_ij = np.angle(yij)
-                if i == j:
-                    J3[qi_idx, j] = sum(
-                        vi * self.voltages[b] * abs(y_row[b]) *
-                        np.cos(delta_i - self.angles[b] - np.angle(y_row[b]))
-                        for b in all_bus if b != bus_i)
-                else:
-                    J3[qi_idx, j] = -vi * vj * abs(yij) * np.cos(delta_i - delta_j - theta_ij)
-        return J3
-
-    def calc_j4(self, pq_buses, all_bus):
-        sizeq = len(pq_buses)
-        J4 = np.zeros((sizeq, sizeq))
-        for i, bus_i in enumerate(pq_buses):
-            vi = self.voltages[bus_i]
-            delta_i = self.angles[bus_i]
-            y_row = self.ybus.loc[bus_i]
-            for j, bus_j in enumerate(pq_buses):
-                delta_j = self.angles[bus_j]
-                yij = y_row[bus_j]
-                theta_ij = np.angle(yij)
-                if bus_i == bus_j:
-                    J4[i, j] = (sum(self.voltages[b] * abs(y_row[b]) * np.sin(delta_i - self.angles[b] - np.angle(y_row[b])) for b in all_bus)
-                                - vi * abs(y_row[bus_i]) * np.sin(np.angle(y_row[bus_i])))
-                else:
-                    J4[i, j] = vi * abs(y_row[bus_j]) * np.sin(delta_i - delta_j - theta_ij)
-        return J4
+    def calc_derivatives(self):
+        # complex power derivatives with respect to voltage magnitude and angle
+        #   dS/dVm = diag(V) conj(Y diag(V/|V|)) + conj(diag(I)) diag(V/|V|)
+        #   dS/dVa = j diag(V) conj(diag(I) - Y diag(V))
+        V = self.solution.voltage_vector()
+        Ibus = self.ybus @ V
+
+        diagV = sp.diags(V)
+        diagI = sp.diags(Ibus)
+        diagVnorm = sp.diags(V / np.abs(V))
+
+        dS_dVm = diagV @ (self.ybus @ diagVnorm).conj() + diagI.conj() @ diagVnorm
+        dS_dVa = 1j * diagV @ (diagI - self.ybus @ diagV).conj()
+
+        return dS_dVm.tocsr(), dS_dVa.tocsr()
+
+    def calc_j1(self, dS_dVa, pv_pq):
+        # ∂P/∂δ
+        return dS_dVa[pv_pq][:, pv_pq].real.toarray()
+
+    def calc_j2(self, dS_dVm, pv_pq, pq):
+        # ∂P/∂V
+        return dS_dVm[pv_pq][:, pq].real.toarray()
+
+    def calc_j3(self, dS_dVa, pv_pq, pq):
+        # ∂Q/∂δ
+        return dS_dVa[pq][:, pv_pq].imag.toarray()
+
+    def calc_j4(self, dS_dVm, pq):
+        # ∂Q/∂V
+        return dS_dVm[pq][:, pq].imag.toarray()
+
+    def bus_indices(self):
+        # integer positions of the PV+PQ and PQ buses in Ybus order
+        return self.solution.pv_pq, self.solution.pq
 
     def calc_jacobian(self):
-        bus_list = list(self.buses.keys())
-        pv_pq_buses = [b for b in bus_list if self.buses[b].bus_type in ["PV Bus", "PQ Bus"]]
-        pq_buses = [b for b in bus_list if self.buses[b].bus_type == "PQ Bus"]
-        all_bus = bus_list
+        pv_pq, pq = self.bus_indices()
+        dS_dVm, dS_dVa = self.calc_derivatives()
 
-        J1 = self.calc_j1(pv_pq_buses, all_bus)
-        J2 = self.calc_j2(pv_pq_buses, pq_buses, all_bus)
-        J3 = self.calc_j3(pv_pq_buses, pq_buses, all_bus)
-        J4 = self.calc_j4(pq_buses, all_bus)
+        J1 = self.calc_j1(dS_dVa, pv_pq)
+        J2 = self.calc_j2(dS_dVm, pv_pq, pq)
+        J3 = self.calc_j3(dS_dVa, pv_pq, pq)
+        J4 = self.calc_j4(dS_dVm, pq)
 
         J = np.vstack((np.hstack((J1, J2)), np.hstack((J3, J4))))
 
         return J
 
+    def calc_sparse_pattern(self):
+        # the sparsity of J follows the Ybus pattern (plus the diagonal) and never changes between
+        # iterations, so the CSC index arrays and the map from Ybus entries to J entries are built once
+        N = self.ybus.shape[0]
+        pv_pq, pq = self.bus_indices()
+        n_pv_pq = len(pv_pq)
+
+        ycoo = self.ybus.tocoo()
+        pattern = sp.coo_matrix((np.concatenate((ycoo.data, np.zeros(N, dtype=complex))),
+                                 (np.concatenate((ycoo.row, np.arange(N))), np.concatenate((ycoo.col, np.arange(N))))),
+                                shape=(N, N)).tocsr()
+        pattern.sum_duplicates()
+        pattern = pattern.tocoo()
+        rows, cols = pattern.row, pattern.col
+
+        pv_pq_pos = np.full(N, -1)
+        pv_pq_pos[pv_pq] = np.arange(n_pv_pq)
+        pq_pos = np.full(N, -1)
+        pq_pos[pq] = np.arange(len(pq))
+
+        # masks selecting the Ybus-pattern entries that land in J1, J2, J3 and J4
+        masks = (
+            (pv_pq_pos[rows] >= 0) & (pv_pq_pos[cols] >= 0),
+            (pv_pq_pos[rows] >= 0) & (pq_pos[cols] >= 0),
+            (pq_pos[rows] >= 0) & (pv_pq_pos[cols] >= 0),
+            (pq_pos[rows] >= 0) & (pq_pos[cols] >= 0),
+        )
+        j_rows = np.concatenate((pv_pq_pos[rows[masks[0]]], pv_pq_pos[rows[masks[1]]],
+                                 n_pv_pq + pq_pos[rows[masks[2]]], n_pv_pq + pq_pos[rows[masks[3]]]))
+        j_cols = np.concatenate((pv_pq_pos[cols[masks[0]]], n_pv_pq + pq_pos[cols[masks[1]]],
+                                 pv_pq_pos[cols[masks[2]]], n_pv_pq + pq_pos[cols[masks[3]]]))
+
+        size = n_pv_pq + len(pq)
+        order = np.lexsort((j_rows, j_cols))  # column-major order for CSC
+        indptr = np.zeros(size + 1, dtype=np.int32)
+        np.cumsum(np.bincount(j_cols, minlength=size), out=indptr[1:])
+
+        self.sparse_pattern = {
+            "rows": rows, "cols": cols, "ydata": pattern.data, "diag": rows == cols,
+            "masks": masks, "order": order, "indices": j_rows[order].astype(np.int32),
+            "indptr": indptr, "size": size,
+        }
+        return self.sparse_pattern
+
+    def calc_jacobian_sparse(self):
+        # J in CSC format, filled entry by entry on the fixed pattern without forming dense blocks
+        pat = self.sparse_pattern if self.sparse_pattern is not None else self.calc_sparse_pattern()
+        values = self.calc_jacobian_values(self.solution.voltage_vector())
+
+        return sp.csc_matrix((values, pat["indices"], pat["indptr"]), shape=(pat["size"], pat["size"]))
+
+    def calc_jacobian_values(self, V):
+        # data array of J in CSC order for bus voltages V; V may also be a (K, N) stack of
+        # scenarios, giving one row of J values per scenario
+        pat = self.sparse_pattern if self.sparse_pattern is not None else self.calc_sparse_pattern()
+        rows, cols, y, diag = pat["rows"], pat["cols"], pat["ydata"], pat["diag"]
+
+        Vnorm = V / np.abs(V)
+        Ibus = (self.ybus @ V.T).T
+
+        dS_dVa = 1j * V[..., rows] * np.conj(diag * Ibus[..., rows] - y * V[..., cols])
+        dS_dVm = V[..., rows] * np.conj(y * Vnorm[..., cols]) + diag * np.conj(Ibus[..., rows]) * Vnorm[..., rows]
+
+        m1, m2, m3, m4 = pat["masks"]
+        values = np.concatenate((dS_dVa[..., m1].real, dS_dVm[..., m2].real,
+                                 dS_dVa[..., m3].imag, dS_dVm[..., m4].imag), axis=-1)
+        return values[..., pat["order"]]
 
 if __name__ == "__main__":
     # create test circuit
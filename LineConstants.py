@@ -0,0 +1,40 @@
+# Group 8 - Project 2
+# ECE 2774
+# Vectorized Line Constants
+
+import numpy as np
+from SystemSettings import SystemSettings
+
+MILE = 1609.34  # meters per mile
+
+
+class LineConstants:
+
+    def __init__(self):
+        # (conductor, bundle, geometry) names -> (series R per mile, ln(Deq/DSL), ln(Deq/DSC));
+        # large models reuse a few tower configurations across thousands of spans, so DSL, DSC
+        # and Deq are only evaluated once per configuration
+        self.configs = {}
+
+    def config(self, bundle, geometry):
+        key = (bundle.conductor.name, bundle.name, geometry.name)
+        if key not in self.configs:
+            self.configs[key] = (bundle.conductor.resistance / bundle.num_conductors,
+                                 np.log(geometry.Deq / bundle.dsl),
+                                 np.log(geometry.Deq / bundle.dsc))
+        return self.configs[key]
+
+    def calc(self, bundles, geometries, lengths, base_kv):
+        # Rpu, Xpu and Bpu arrays for many lines in one pass; bundles/geometries are per-line
+        # sequences of Bundle and Geometry objects, lengths in miles, base_kv of each line's bus
+        params = np.array([self.config(b, g) for b, g in zip(bundles, geometries)], dtype=float).reshape(-1, 3)
+        r, ln_dsl, ln_dsc = params.T
+        lengths = np.asarray(lengths, dtype=float)
+        zbase = np.asarray(base_kv, dtype=float) ** 2 / SystemSettings.Sbase
+
+        w = 2 * np.pi * SystemSettings.f
+        Rpu = lengths * r / zbase
+        Xpu = lengths * w * 2e-7 * MILE * ln_dsl / zbase
+        Bpu = lengths * (2 * np.pi * SystemSettings.ε_0) * w * MILE / ln_dsc * zbase
+
+        return Rpu, Xpu, Bpu
@@ -8,6 +8,8 @@ import pandas as pd
 
 class Load:
 
+    __slots__ = ("name", "bus", "real_power", "reactive_power", "rated_voltage", "admittance", "ybase", "y_pu")
+
     def __init__(self, name: str, bus: Bus, real_power: float, reactive_power: float):
         self.name = name
         self.bus = bus
@@ -21,11 +23,13 @@ class Load:
 
         self.y_pu = self.admittance / self.ybase # in per unit
 
-    def y_prim(self):
+    def y_prim(self) -> complex:
         # primitive admittance (Y = 1 / jX1) for the positive-sequence network
 
         Y = self.y_pu
 
-        Yprim1 = pd.DataFrame([[Y]], index=[self.bus.name], columns=[self.bus.name])
+        return Y
 
-        return Yprim1
+    def to_dataframe(self, y: complex):
+        # labelled 1x1 view of the primitive admittance, only built for printing
+        return pd.DataFrame([[y]], index=[self.bus.name], columns=[self.bus.name])
@@ -0,0 +1,67 @@
+# Group 8 - Project 2
+# ECE 2774
+# Compiled Network Model
+
+import numpy as np
+from SystemSettings import SystemSettings
+
+BUS_TYPES = ("PQ Bus", "PV Bus", "Slack Bus")  # bus_type codes 0, 1, 2
+PQ, PV, SLACK = range(3)
+
+
+class NetworkModel:
+
+    def __init__(self, circuit):
+        # struct-of-arrays snapshot of a Circuit: one NumPy array per attribute, with buses
+        # referred to by their integer index (circuit.bus_index) instead of by name
+        self.bus_names = list(circuit.buses.keys())
+        self.bus_index = dict(circuit.bus_index)
+        self.N = len(self.bus_names)
+
+        buses = list(circuit.buses.values())
+        self.base_kv = np.array([bus.base_kv for bus in buses], dtype=float)
+        self.bus_type = np.array([BUS_TYPES.index(bus.bus_type) for bus in buses], dtype=np.int8)
+        self.vm = np.array([bus.vpu for bus in buses], dtype=float)
+        self.va = np.array([bus.delta for bus in buses], dtype=float)
+
+        # branches: lines first, then transformers
+        lines = list(circuit.transmissionlines.values())
+        xfmrs = list(circuit.transformers.values())
+        branches = lines + xfmrs
+        self.branch_names = [br.name for br in branches]
+        self.branch_is_transformer = np.concatenate((np.zeros(len(lines), dtype=bool), np.ones(len(xfmrs), dtype=bool)))
+        self.from_bus = self.bus_indices(br.bus1.name for br in branches)
+        self.to_bus = self.bus_indices(br.bus2.name for br in branches)
+        self.r = np.array([line.Rpu for line in lines] + [xfmr.Rpusys for xfmr in xfmrs], dtype=float)
+        self.x = np.array([line.Xpu for line in lines] + [xfmr.Xpusys for xfmr in xfmrs], dtype=float)
+        self.b = np.concatenate((np.array([line.Bpu for line in lines], dtype=float), np.zeros(len(xfmrs))))
+
+        gens = list(circuit.generators.values())
+        self.gen_names = [gen.name for gen in gens]
+        self.gen_bus = self.bus_indices(gen.bus.name for gen in gens)
+        self.gen_p = np.array([gen.mw_setpoint for gen in gens], dtype=float)  # MW
+        self.gen_q = np.array([getattr(gen, 'mvar_setpoint', 0) for gen in gens], dtype=float)  # MVAR
+
+        loads = list(circuit.loads.values())
+        self.load_names = [load.name for load in loads]
+        self.load_bus = self.bus_indices(load.bus.name for load in loads)
+        self.load_p = np.array([load.real_power for load in loads], dtype=float)  # MW
+        self.load_q = np.array([load.reactive_power for load in loads], dtype=float)  # MVAR
+
+    def bus_indices(self, names):
+        return np.fromiter((self.bus_index[name] for name in names), dtype=np.int64)
+
+    @property
+    def pv_pq(self):
+        # non-slack buses in bus order
+        return np.flatnonzero(self.bus_type != SLACK)
+
+    @property
+    def pq(self):
+        return np.flatnonzero(self.bus_type == PQ)
+
+    def calc_injections(self):
+        # net specified P and Q per bus in p.u. (generation minus load)
+        p = np.bincount(self.gen_bus, self.gen_p, self.N) - np.bincount(self.load_bus, self.load_p, self.N)
+        q = np.bincount(self.gen_bus, self.gen_q, self.N) - np.bincount(self.load_bus, self.load_q, self.N)
+        return p / SystemSettings.Sbase, q / SystemSettings.Sbase
@@ -0,0 +1,111 @@
+# Group 8 - Project 2
+# ECE 2774
+# Parallel Fault Sweep
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from FaultSweep import FaultSweep
+from ZbusSolver import ZbusSolver
+
+# per-process state of a worker, filled in once by init_worker
+worker_state = {}
+
+
+class SharedMatrices:
+
+    def __init__(self, matrices):
+        # copies the CSC arrays of the three sequence Ybus matrices into one shared memory block;
+        # workers map them as read-only arrays instead of receiving a Circuit
+        # each worker factorizes them once with SuperLU (about 0.08 s for all three on a 10k-bus
+        # grid); sharing the exported L/U factors would save that, but their triangular solves
+        # take about 2x as long per Zbus column (0.39 s against 0.18 s for 256 columns), so the
+        # refactorization pays for itself after about 100 columns per worker
+        arrays = []
+        for seq, matrix in enumerate(matrices):
+            matrix = sp.csc_matrix(matrix)
+            for name in ("data", "indices", "indptr"):
+                arrays.append(((seq, name), np.ascontiguousarray(getattr(matrix, name))))
+        self.N = matrices[0].shape[0]
+
+        offsets, size = [], 0
+        for _, array in arrays:
+            size = (size + 63) // 64 * 64  # keep every array 64-byte aligned
+            offsets.append(size)
+            size += array.nbytes
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.layout = []  # (seq, name, offset, dtype, shape) for attaching in the workers
+        for ((seq, name), array), offset in zip(arrays, offsets):
+            view = np.ndarray(array.shape, dtype=array.dtype, buffer=self.shm.buf, offset=offset)
+            view[...] = array
+            self.layout.append((seq, name, offset, array.dtype.str, array.shape))
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach_matrices(shm_name, layout, N):
+    # rebuild the three sequence Ybus matrices as views on the shared block
+    shm = shared_memory.SharedMemory(name=shm_name)
+    arrays = [{}, {}, {}]
+    for seq, name, offset, dtype, shape in layout:
+        arrays[seq][name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+    return shm, [sp.csc_matrix((a["data"], a["indices"], a["indptr"]), shape=(N, N), copy=False) for a in arrays]
+
+
+def init_worker(shm_name, layout, N, bus_names, v_prefault, Zf):
+    shm, matrices = attach_matrices(shm_name, layout, N)
+    bus_index = {name: idx for idx, name in enumerate(bus_names)}
+    zbuses = [ZbusSolver(matrix, bus_index) for matrix in matrices]
+
+    worker_state["shm"] = shm  # keep the mapping alive for the life of the worker
+    worker_state["sweep"] = FaultSweep.from_zbuses(bus_names, zbuses, v_prefault, Zf)
+
+
+def sweep_worker_chunk(chunk, fault_types, include_voltages):
+    return worker_state["sweep"].sweep_chunk(chunk, fault_types, include_voltages)
+
+
+class ParallelFaultSweep:
+
+    def __init__(self, circuit, v_prefault: complex = 1.0 + 0.0j, Zf: complex = 0 + 0j, max_workers: int = None):
+        self.circuit = circuit
+        self.v_prefault = v_prefault
+        self.Zf = Zf
+        self.max_workers = max_workers or os.cpu_count()
+
+        self.zbuses = circuit.calc_sequence_zbuses()
+        if self.zbuses[0] is None:
+            raise ValueError("Sequence networks are singular; cannot run a fault sweep.")
+
+    def iter_results(self, buses=None, fault_types=None, chunk_size: int = 64, include_voltages: bool = True):
+        # splits the faulted buses across a process pool and yields (currents, voltages) tables
+        # chunk by chunk as workers finish them, in completion order
+        bus_names = list(self.circuit.buses.keys())
+        buses = bus_names if buses is None else list(buses)
+        chunks = [buses[i:i + chunk_size] for i in range(0, len(buses), chunk_size)]
+
+        shared = SharedMatrices(self.circuit.calc_sequence_networks())
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=init_worker,
+                                     initargs=(shared.shm.name, shared.layout, shared.N, bus_names,
+                                               self.v_prefault, self.Zf)) as pool:
+                futures = [pool.submit(sweep_worker_chunk, chunk, fault_types, include_voltages) for chunk in chunks]
+                for future in as_completed(futures):
+                    yield future.result()
+        finally:
+            shared.close()
+
+    def run(self, buses=None, fault_types=None, chunk_size: int = 64, include_voltages: bool = True):
+        # same tables as FaultSweep.run, collected from all workers
+        results = list(self.iter_results(buses, fault_types, chunk_size, include_voltages))
+        if not results:
+            return FaultSweep(self.circuit, self.v_prefault, self.Zf).run([], fault_types)
+        currents = pd.concat([c for c, _ in results])
+        voltages = pd.concat([v for _, v in results]) if include_voltages else None
+        return currents, voltages
@@ -0,0 +1,106 @@
+# Group 8 - Project 2
+# ECE 2774
+# Power Flow Result
+
+import numpy as np
+import pandas as pd
+
+# verbosity levels of the power flow solvers
+QUIET, SUMMARY, DETAILED = 0, 1, 2
+
+
+def verbosity(verbose):
+    # verbose=True (the solvers' default) keeps the full console report of earlier versions
+    return DETAILED if verbose is True else int(verbose)
+
+
+class PowerFlowResult:
+
+    def __init__(self, method: str, converged: bool, iterations: int, bus_names, vm, va, p, q, pv_pq, pq,
+                 mismatches, mismatch_history, timings: dict, factorizations: int = None,
+                 factorizations_saved: int = None, step_sizes=None, diverged: bool = False,
+                 singular: bool = False):
+        # outcome of one power flow solve as arrays in Ybus bus order:
+        #   vm (p.u.), va (radians), p and q (calculated injections, p.u.), mismatches (final ΔP for
+        #   the PV+PQ buses then ΔQ for the PQ buses), mismatch_history (max |mismatch| of each
+        #   iteration), timings (seconds: "total", plus one entry per phase when traced)
+        #   factorizations: Jacobian factorizations done (Newton-Raphson); factorizations_saved:
+        #   iterations that reused an earlier factorization (dishonest Newton only, else None)
+        #   step_sizes: step multiplier μ of each iteration (step control only, else None)
+        #   diverged: the solver stopped early because the case was diverging
+        #   singular: the solver stopped because the Jacobian could not be factorized
+        # truth value is converged, so `if solution.power_flow(...)` works as before
+        self.method = method
+        self.converged = converged
+        self.iterations = iterations
+        self.bus_names = list(bus_names)
+        self.vm = vm
+        self.va = va
+        self.p = p
+        self.q = q
+        self.pv_pq = pv_pq
+        self.pq = pq
+        self.mismatches = mismatches
+        self.mismatch_history = mismatch_history
+        self.timings = timings
+        self.factorizations = factorizations
+        self.factorizations_saved = factorizations_saved
+        self.step_sizes = step_sizes
+        self.diverged = diverged
+        self.singular = singular
+
+    def __bool__(self):
+        return bool(self.converged)
+
+    def __repr__(self):
+        status = ("converged" if self.converged else "diverged" if self.diverged
+                  else "singular Jacobian" if self.singular else "not converged")
+        max_mismatch = np.max(np.abs(self.mismatches)) if len(self.mismatches) else 0.0
+        return (f"PowerFlowResult({self.method}, {status} in {self.iterations} iterations, "
+                f"{len(self.bus_names)} buses, max mismatch {max_mismatch:.3g})")
+
+    def to_dataframe(self):
+        # bus table: voltage magnitude (p.u.), angle (degrees) and P, Q injections (p.u.)
+        return pd.DataFrame({"V (pu)": self.vm, "angle (deg)": np.degrees(self.va), "P (pu)": self.p,
+                             "Q (pu)": self.q}, index=pd.Index(self.bus_names, name="bus"))
+
+    def format_bus_results(self):
+        n_pv_pq = len(self.pv_pq)  # start of Q mismatches
+        lines = ["\nFinal Bus Angles (radians):"]
+        lines += [f"{name}: {angle:.6f} rad" for name, angle in zip(self.bus_names, self.va)]
+        lines.append("\nFinal Bus Voltages (p.u.):")
+        lines += [f"{name}: {v:.6f} p.u." for name, v in zip(self.bus_names, self.vm)]
+        lines.append("\nFinal Power Mismatch:")
+        lines += [f"{self.bus_names[i]}: ΔP = {self.mismatches[k]:.4f}" for k, i in enumerate(self.pv_pq)]
+        lines += [f"{self.bus_names[i]}: ΔQ = {self.mismatches[n_pv_pq + k]:.4f}" for k, i in enumerate(self.pq)]
+        return "\n".join(lines)
+
+    def format_jacobian(self, J):
+        # labelled dense Jacobian, one row per line
+        row_labels = [f"∂P {self.bus_names[i]}" for i in self.pv_pq] + [f"∂Q {self.bus_names[i]}" for i in self.pq]
+        col_labels = [f"∂δ {self.bus_names[i]}" for i in self.pv_pq] + [f"∂V {self.bus_names[i]}" for i in self.pq]
+        row_width = max(len(label) for label in row_labels) + 1
+        col_width = 12
+
+        lines = ["\nFinal Jacobian Matrix:", " " * row_width + "".join(f"{col:^{col_width}}" for col in col_labels)]
+        for row_label, row in zip(row_labels, J):
+            lines.append(f"{row_label:{row_width}}" + "".join(f"{value:^{col_width}.6f}" for value in row))
+        return "\n".join(lines)
+
+    def report(self, jacobian=None):
+        # console report of a converged solve; jacobian (dense or sparse) is appended when given
+        if self.singular:
+            return f"The Jacobian is singular after {self.iterations} iterations, cannot solve."
+        if self.diverged:
+            return f"Diverging after {self.iterations} iterations, stopped without convergence."
+        if not self.converged:
+            return "Max iterations reached without convergence."
+
+        lines = ["\nConverged!", f"\n{self.method.upper()} SOLUTION SUMMARY", "=" * 60,
+                 f"\nConverged in {self.iterations} iterations"]
+        if self.factorizations_saved is not None:
+            lines.append(f"Jacobian factorizations: {self.factorizations} ({self.factorizations_saved} saved by reuse)")
+        lines.append(self.format_bus_results())
+        if jacobian is not None:
+            lines.append(self.format_jacobian(jacobian.toarray() if hasattr(jacobian, "toarray") else jacobian))
+        return "\n".join(lines)
@@ -1,18 +1,39 @@
+import time
 import numpy as np
 import pandas as pd
 from Circuit import Circuit
 from SystemSettings import SystemSettings
+from SparseLU import SparseLU, DenseLU
+from SolverTrace import null_phase
+from PowerFlowResult import PowerFlowResult, verbosity, SUMMARY, DETAILED
 
 
 class Solution:
 
-    def __init__(self, circuit: Circuit):
+    def __init__(self, circuit: Circuit, ybus=None):
+        # ybus: optional modified Ybus (e.g. with an element outaged) to solve instead of the Circuit's
         self.circuit = circuit
-        self.ybus = circuit.calc_ybus() # Ybus from Circuit
+        self.bus_names = list(circuit.buses.keys())  # Ybus ordering
+        self.ybus = circuit.calc_ybus() if ybus is None else ybus # sparse Ybus from Circuit
+        self.model = circuit.calc_network_model()  # bus types and injections as arrays
         self.voltages, self.angles = self.get_voltages()  # voltage & angles in p.u. and radians
-        self.zbus_pos = circuit.zbus_pos
-        self.zbus_neg = circuit.zbus_neg
-        self.zbus_zero = circuit.zbus_zero
+        self.pv_pq, self.pq = self.calc_bus_indices()
+        self.p_specified, self.q_specified = self.calc_specified_injections()
+        self.jacobian = None  # Jacobian pattern, kept between Newton-Raphson solves
+        self.lu = None
+
+    # sequence Zbus factorizations live on the Circuit and are only built when a fault study needs them
+    @property
+    def zbus_pos(self):
+        return self.circuit.zbus_pos
+
+    @property
+    def zbus_neg(self):
+        return self.circuit.zbus_neg
+
+    @property
+    def zbus_zero(self):
+        return self.circuit.zbus_zero
 
     def get_voltages(self):
         voltages = {}
@@ -24,194 +45,343 @@ class Solution:
 
         return voltages, angles
 
-    def compute_power_injection(self):
-        num_buses = len(self.circuit.buses)  # total number of buses
-        P = np.zeros(num_buses)  # array for real power injections
-        Q = np.zeros(num_buses)  # array for reactive power injections
-
-        bus_list = list(self.circuit.buses.keys())  # ordered list of bus names
+    def warm_start(self, voltages, angles):
+        # start from a previous solution instead of the flat start
+        self.voltages = dict(voltages)
+        self.angles = dict(angles)
 
-        for i, bus_name in enumerate(bus_list):  # iterate through each bus
-            vk = self.voltages[bus_name]  # voltage magnitude at bus k
-            delta_k = self.angles[bus_name]  # voltage angle at bus k
-            ybus_row = self.circuit.ybus.loc[bus_name]  # get Ybus row for bus k
+    def calc_bus_indices(self):
+        # integer positions of the PV+PQ (non-slack) buses and the PQ buses in Ybus order
+        return self.model.pv_pq, self.model.pq
 
-            pk, qk = 0, 0  # initialize power injections to be 0
+    def calc_specified_injections(self):
+        # per-bus specified P and Q in p.u., built once from the generators and loads
+        return self.model.calc_injections()
 
-            for bus_j, ykj in ybus_row.items():  # iterate through connected buses
-                if bus_j in self.voltages:
-                    vj = self.voltages[bus_j]  # voltage magnitude at bus j
-                    delta_j = self.angles[bus_j]  # voltage angle at bus j
-                    theta_kj = np.angle(ykj)  # phase angle of Ybus element
+    def voltage_vector(self):
+        # complex bus voltages V = |V|∠δ in Ybus order
+        vm = np.array([self.voltages[b] for b in self.bus_names], dtype=float)
+        va = np.array([self.angles[b] for b in self.bus_names], dtype=float)
+        return vm * np.exp(1j * va)
 
-                    # compute power injections
-                    pk += vk * vj * abs(ykj) * np.cos(delta_k - delta_j - theta_kj)
-                    qk += vk * vj * abs(ykj) * np.sin(delta_k - delta_j - theta_kj)
+    def compute_power_injection(self):
+        # S = V · conj(Ybus · V), one sparse mat-vec over the stored Ybus entries
+        V = self.voltage_vector()
+        S = V * np.conj(self.ybus @ V)
 
-            P[i] = pk  # store computed real power injection
-            Q[i] = qk  # store computed reactive power injection
+        P = S.real  # real power injections
+        Q = S.imag  # reactive power injections
 
         return P, Q
 
     def compute_power_mismatch(self):
         P_calc, Q_calc = self.compute_power_injection()
-        bus_list = list(self.circuit.buses.keys())
-
-        # create mappings from bus name to index
-        bus_index = {name: idx for idx, name in enumerate(bus_list)}
-
-        # first compute ΔP for all non-slack buses
-        delta_p = []
-        for bus_name in bus_list:
-            bus = self.circuit.buses[bus_name]
-            if bus.bus_type == "Slack Bus":
-                continue
-
-            p_specified = 0
-            for gen in self.circuit.generators.values():
-                if gen.bus.name == bus_name:
-                    p_specified += gen.mw_setpoint / SystemSettings.Sbase
-
-            for load in self.circuit.loads.values():
-                if load.bus.name == bus_name:
-                    p_specified -= load.real_power / SystemSettings.Sbase
-
-            i = bus_index[bus_name]
-            delta_p.append(p_specified - P_calc[i])
-
-        # then compute ΔQ for only PQ buses
-        delta_q = []
-        for bus_name in bus_list:
-            bus = self.circuit.buses[bus_name]
-            if bus.bus_type != "PQ Bus":
-                continue
 
-            q_specified = 0
-            for gen in self.circuit.generators.values():
-                if gen.bus.name == bus_name and hasattr(gen, 'mvar_setpoint'):
-                    q_specified += gen.mvar_setpoint / SystemSettings.Sbase
-
-            for load in self.circuit.loads.values():
-                if load.bus.name == bus_name:
-                    q_specified -= load.reactive_power / SystemSettings.Sbase
-
-            i = bus_index[bus_name]
-            delta_q.append(q_specified - Q_calc[i])
+        # ΔP for all non-slack buses, then ΔQ for only PQ buses
+        delta_p = self.p_specified[self.pv_pq] - P_calc[self.pv_pq]
+        delta_q = self.q_specified[self.pq] - Q_calc[self.pq]
 
         # return full mismatch vector
-        return np.array(delta_p + delta_q)
+        return np.concatenate((delta_p, delta_q))
+
+    def newton_raphson(self, tolerance=0.001, max_iterations=50, sparse=False, verbose=True, trace=None,
+                       dishonest=False, reduction_threshold=0.25, step_control=None, divergence_limit=None,
+                       stall_iterations=None, min_step=1e-3):
+        # returns a PowerFlowResult (truthy when converged)
+        # sparse=True builds J directly in CSC format on a fixed pattern and solves it with a
+        # SuperLU factorization
+        # verbose: 0/False prints nothing, 1 prints the final report, 2/True also prints every
+        # iteration and the final Jacobian
+        # trace: optional SolverTrace recording the time of each phase of each iteration
+        # dishonest=True keeps the last LU factorization of J and solves with it again for as long
+        # as each iteration still cuts the max mismatch to at most reduction_threshold times the
+        # previous one; once the reduction is slower than that, J is rebuilt and refactorized
+        # step_control: None applies the full Newton step; "iwamoto" scales it by the optimal
+        # multiplier and "line_search" backtracks until the mismatch norm drops (see calc_step_size)
+        # the solve stops early as diverged when the max mismatch is not finite, and, when they are
+        # set, when it grows past divergence_limit times the smallest one so far or has not
+        # improved on it for stall_iterations iterations (both off by default, so a solve that
+        # stays finite runs to max_iterations), or when the step size of step_control falls below
+        # min_step (the mismatch cannot be reduced along the Newton direction: likely no solution)
+        if step_control not in (None, "iwamoto", "line_search"):
+            raise ValueError(f"Invalid step control: {step_control}")
+        if self.jacobian is None:
+            from Jacobian import Jacobian
+            self.jacobian = Jacobian(self)
+            self.lu = SparseLU()
+        jacobian = self.jacobian
+        lu = self.lu if sparse else DenseLU()
+        phase = trace.phase if trace is not None else null_phase
+        level = verbosity(verbose)
+        start, first_record = time.perf_counter(), len(trace.iterations) if trace is not None else 0
+        history = []
+        J = None
+        stats = {"factorizations": 0, "factorizations_saved": 0 if dishonest else None,
+                 "step_sizes": [] if step_control is not None else None}
 
-    def newton_raphson(self, tolerance=0.001, max_iterations=50):
         for i in range(max_iterations):
-            print(f"\nIteration {i + 1}:")
+            if level >= DETAILED:
+                print(f"\nIteration {i + 1}:")
+            if trace is not None:
+                trace.start_iteration("newton", i + 1)
 
             # Step 1: compute mismatches
-            mismatches = self.compute_power_mismatch()
-            max_mismatch = np.max(np.abs(mismatches))
+            with phase("mismatch"):
+                mismatches = self.compute_power_mismatch()
+                max_mismatch = np.max(np.abs(mismatches))
+            history.append(max_mismatch)
+            if trace is not None:
+                trace.mismatch(mismatches)
 
-            print(f"\nMax mismatch = {max_mismatch:.6f}")
+            if level >= DETAILED:
+                print(f"\nMax mismatch = {max_mismatch:.6f}")
+
+            if max_mismatch < tolerance:
+                if trace is not None:
+                    trace.end_iteration()
+                result = self.make_result("Newton-Raphson", True, i + 1, mismatches, history, start, trace,
+                                          first_record, **stats)
+                if level >= DETAILED:
+                    # the Jacobian at the solution is only formed for this report
+                    print(result.report(jacobian.calc_jacobian_sparse() if sparse else jacobian.calc_jacobian()))
+                    return result
+                return self.report_result(level, result)
+
+            best = int(np.argmin(history))
+            diverging = (not np.isfinite(max_mismatch)
+                         or (divergence_limit is not None and max_mismatch > divergence_limit * history[best])
+                         or (stall_iterations is not None and i - best >= stall_iterations))
+            if diverging:
+                if trace is not None:
+                    trace.end_iteration()
+                return self.report_result(level, self.make_result("Newton-Raphson", False, i + 1, mismatches, history,
+                                                                  start, trace, first_record, diverged=True, **stats))
+
+            # dishonest Newton: the old factorization is kept while the mismatch still falls fast
+            reuse = dishonest and J is not None and max_mismatch <= reduction_threshold * history[-2]
+            if trace is not None and dishonest:
+                trace.note(jacobian_reused=reuse)
 
             # Step 2: compute Jacobian
-            from Jacobian import Jacobian
-            J = Jacobian(self).calc_jacobian()
+            if not reuse:
+                with phase("jacobian"):
+                    if sparse:
+                        J = jacobian.calc_jacobian_sparse()
+                    else:
+                        J = jacobian.calc_jacobian()
 
             # Step 3: solve for Δx
             try:
-                delta_x = np.linalg.solve(J, mismatches)
-            except np.linalg.LinAlgError:
-                print("The Jacobian is singular, cannot solve")
-                return False
+                with phase("solve"):
+                    if reuse:
+                        delta_x = lu.solve(mismatches)
+                        stats["factorizations_saved"] += 1
+                    elif sparse or dishonest:
+                        delta_x = lu.factorize(J).solve(mismatches)
+                        stats["factorizations"] += 1
+                    else:
+                        delta_x = np.linalg.solve(J, mismatches)
+                        stats["factorizations"] += 1
+            except (np.linalg.LinAlgError, RuntimeError):
+                if trace is not None:
+                    trace.end_iteration()
+                return self.report_result(level, self.make_result("Newton-Raphson", False, i + 1, mismatches,
+                                                                  history, start, trace, first_record, singular=True,
+                                                                  **stats))
+
+            # Step 4: update x(i+1) = x(i) + μ·Δx (μ = 1 without step control); the step size
+            # search evaluates the mismatch along Δx and is timed as its own phase
+            if step_control is None:
+                with phase("update"):
+                    n_pv_pq = len(self.pv_pq)
+                    self.update_state(delta_x[:n_pv_pq], delta_x[n_pv_pq:])
+            else:
+                with phase("step_control"):
+                    step = self.calc_step_size(mismatches, delta_x, step_control, min_step)
+                stats["step_sizes"].append(step)
+            if trace is not None:
+                if step_control is not None:
+                    trace.note(step_size=step)
+                trace.matrix(J, lu if sparse else None)
+                trace.end_iteration()
+
+            if step_control is not None and step < min_step:
+                return self.report_result(level, self.make_result("Newton-Raphson", False, i + 1,
+                                                                  self.compute_power_mismatch(), history, start, trace,
+                                                                  first_record, diverged=True, **stats))
+
+        return self.report_result(level, self.make_result("Newton-Raphson", False, max_iterations,
+                                                          self.compute_power_mismatch(), history, start, trace,
+                                                          first_record, **stats))
+
+    def make_result(self, method, converged, iterations, mismatches, history, start, trace=None, first_record=0,
+                    factorizations=None, factorizations_saved=None, step_sizes=None, diverged=False, singular=False):
+        # PowerFlowResult from the current state; the per-phase times are those of the iterations
+        # this solve added to the trace
+        vm = np.array([self.voltages[b] for b in self.bus_names], dtype=float)
+        va = np.array([self.angles[b] for b in self.bus_names], dtype=float)
+        P, Q = self.compute_power_injection()
+
+        timings = {"total": time.perf_counter() - start}
+        if trace is not None:
+            trace.close()
+            for record in trace.iterations[first_record:]:
+                for name, seconds in record["phases"].items():
+                    timings[name] = timings.get(name, 0.0) + seconds
+
+        return PowerFlowResult(method, converged, iterations, self.bus_names, vm, va, P, Q, self.pv_pq, self.pq,
+                               mismatches, np.array(history, dtype=float), timings, factorizations,
+                               factorizations_saved, None if step_sizes is None else np.array(step_sizes, dtype=float),
+                               diverged, singular)
+
+    def calc_step_size(self, mismatches, delta_x, step_control, min_step):
+        # applies x + μ·Δx to the state and returns μ; both methods start from the mismatch f1 at the
+        # full step, which costs one extra mismatch evaluation per iteration
+        #   "iwamoto": models the mismatch along the step as f(μ) = (1 - μ)·f0 + μ²·f1 (exact for the
+        #   quadratic power equations in rectangular form, a close approximation in polar form) and
+        #   takes the μ in (0, 2] that minimizes ||f(μ)||²; μ near 0 means the case has no solution
+        #   "line_search": backtracks from μ = 1 with quadratic interpolation (at most a factor of 10
+        #   per cut) until ||f(μ)||² ≤ (1 - 2e-4·μ)·||f0||², or μ drops below min_step
+        n_pv_pq = len(self.pv_pq)
+        angles, voltages = dict(self.angles), dict(self.voltages)
+
+        def move_to(mu):
+            self.angles, self.voltages = dict(angles), dict(voltages)
+            self.update_state(mu * delta_x[:n_pv_pq], mu * delta_x[n_pv_pq:])
+
+        def mismatch_at(mu):
+            move_to(mu)
+            return self.compute_power_mismatch()
+
+        f1 = mismatch_at(1.0)
+        f0_norm = mismatches @ mismatches
+
+        if step_control == "iwamoto":
+            # roots of d/dμ ||(1 - μ)·f0 + μ²·f1||² = 0
+            a_c = mismatches @ f1
+            roots = np.roots([2 * (f1 @ f1), -3 * a_c, f0_norm + 2 * a_c, -f0_norm])
+            roots = roots[(np.abs(roots.imag) < 1e-9) & (roots.real > 0) & (roots.real <= 2)].real
+            if roots.size == 0 or not np.all(np.isfinite(f1)):
+                mu = 1.0 if np.all(np.isfinite(f1)) else min_step / 2
+            else:
+                model = [np.sum(((1 - mu) * mismatches + mu ** 2 * f1) ** 2) for mu in roots]
+                mu = roots[int(np.argmin(model))]
+            if mu != 1.0:
+                move_to(mu)
+            return float(mu)
+
+        elif step_control == "line_search":
+            mu, f_norm = 1.0, f1 @ f1
+            while not (f_norm <= (1 - 2e-4 * mu) * f0_norm):
+                # minimizer of the quadratic through ||f0||², its slope -2·||f0||² and ||f(μ)||²
+                interpolated = f0_norm * mu ** 2 / (f_norm - f0_norm + 2 * f0_norm * mu) if np.isfinite(f_norm) else 0
+                mu = max(0.1 * mu, min(0.5 * mu, interpolated))
+                if mu < min_step:
+                    move_to(mu)
+                    break
+                f = mismatch_at(mu)
+                f_norm = f @ f
+            return float(mu)
+
+    def fast_decoupled(self, tolerance=0.001, max_iterations=50, variant="XB", verbose=True, trace=None):
+        # constant B' and B'' are factorized once; each half-iteration is a pair of triangular solves
+        # returns a PowerFlowResult; verbose and trace as for newton_raphson (the factorization is
+        # its own phase)
+        from FastDecoupled import FastDecoupled
+        level = verbosity(verbose)
+        start, first_record = time.perf_counter(), len(trace.iterations) if trace is not None else 0
+        if trace is not None:
+            trace.start_iteration("fast_decoupled", 0)
+        phase = trace.phase if trace is not None else null_phase
+        with phase("factorize"):
+            fdlf = FastDecoupled(self, variant)
+        if trace is not None:
+            trace.end_iteration()
+        method = f"Fast Decoupled ({fdlf.variant})"
+        n_pv_pq = len(self.pv_pq)
+        history = []
 
+        for i in range(max_iterations):
+            if level >= DETAILED:
+                print(f"\nIteration {i + 1}:")
+            if trace is not None:
+                trace.start_iteration("fast_decoupled", i + 1)
+
+            # P-δ half-iteration
+            with phase("mismatch"):
+                mismatches = self.compute_power_mismatch()
+                max_mismatch = np.max(np.abs(mismatches))
+            history.append(max_mismatch)
+            if trace is not None:
+                trace.mismatch(mismatches)
+            if level >= DETAILED:
+                print(f"\nMax mismatch = {max_mismatch:.6f}")
             if max_mismatch < tolerance:
-                print("\nConverged!")
-
-                print("\nNEWTON-RAPHSON SOLUTION SUMMARY")
-                print("=" * 60)
-                print(f"\nConverged in {i + 1} iterations")
-
-                print("\nFinal Bus Angles (radians):")
-                for bus_name in self.circuit.buses:
-                    print(f"{bus_name}: {self.angles[bus_name]:.6f} rad")
-
-                print("\nFinal Bus Voltages (p.u.):")
-                for bus_name in self.circuit.buses:
-                    print(f"{bus_name}: {self.voltages[bus_name]:.6f} p.u.")
-
-                print("\nFinal Power Mismatch:")
-                bus_list = list(self.circuit.buses.keys())
-                p_index = 0
-                q_index = len(
-                    [b for b in self.circuit.buses.values() if b.bus_type != "Slack Bus"])  # start of Q mismatches
-                for bus_name in bus_list:
-                    bus = self.circuit.buses[bus_name]
-                    if bus.bus_type == "Slack Bus":
-                        continue
-                    print(f"{bus_name}: ΔP = {mismatches[p_index]:.4f}")
-                    p_index += 1
-
-                for bus_name in bus_list:
-                    bus = self.circuit.buses[bus_name]
-                    if bus.bus_type == "PQ Bus":
-                        print(f"{bus_name}: ΔQ = {mismatches[q_index]:.4f}")
-                        q_index += 1
-
-                print("\nFinal Jacobian Matrix:")
-
-                # Extract the bus lists needed for labeling
-                bus_list = list(self.circuit.buses.keys())
-                pv_pq_buses = [b for b in bus_list if self.circuit.buses[b].bus_type in ["PV Bus", "PQ Bus"]]
-                pq_buses = [b for b in bus_list if self.circuit.buses[b].bus_type == "PQ Bus"]
-
-                # Create row and column labels
-                row_labels = []
-                for bus in pv_pq_buses:
-                    row_labels.append(f"∂P {bus}")
-                for bus in pq_buses:
-                    row_labels.append(f"∂Q {bus}")
-
-                col_labels = []
-                for bus in pv_pq_buses:
-                    col_labels.append(f"∂δ {bus}")
-                for bus in pq_buses:
-                    col_labels.append(f"∂V {bus}")
-
-                # Calculate max width for row labels
-                row_width = max(len(label) for label in row_labels) + 1
-                col_width = 12
-
-                print(" " * row_width, end="")
-                for col in col_labels:
-                    print(f"{col:^{col_width}}", end="")
-                print()
-
-                for i, row_label in enumerate(row_labels):
-                    print(f"{row_label:{row_width}}", end="")
-                    for j in range(J.shape[1]):
-                        print(f"{J[i, j]:^{col_width}.6f}", end="")
-                    print()
-
-                return True
-
-            # Step 4: update x(i+1) = x(i) + Δx
-            idx = 0
-
-            # update all angles for PV and PQ buses
-            for bus_name, bus in self.circuit.buses.items():
-                if bus.bus_type != "Slack Bus":  # Update angles for PV and PQ buses
-                    self.angles[bus_name] += delta_x[idx]
-                    idx += 1
-
-            # update voltages for PQ buses only
-            for bus_name, bus in self.circuit.buses.items():
-                if bus.bus_type == "PQ Bus":  # Update voltages only for PQ buses
-                    self.voltages[bus_name] += delta_x[idx]
-                    idx += 1
-
-        print("Max iterations reached without convergence.")
-        return False
-
-    def power_flow(self, tolerance=0.001, max_iterations=50):
-        return self.newton_raphson(tolerance=tolerance, max_iterations=max_iterations)
+                if trace is not None:
+                    trace.end_iteration()
+                return self.report_result(level, self.make_result(method, True, i + 1, mismatches, history, start,
+                                                                  trace, first_record))
+
+            with phase("solve"):
+                vm = np.abs(self.voltage_vector())
+                delta_angles = fdlf.calc_angle_update(mismatches[:n_pv_pq], vm)
+            with phase("update"):
+                self.update_state(delta_angles, [])
+
+            # Q-V half-iteration
+            with phase("mismatch"):
+                mismatches = self.compute_power_mismatch()
+            if np.max(np.abs(mismatches)) < tolerance:
+                if trace is not None:
+                    trace.mismatch(mismatches)
+                    trace.end_iteration()
+                return self.report_result(level, self.make_result(method, True, i + 1, mismatches, history, start,
+                                                                  trace, first_record))
+
+            if fdlf.lu_q is not None:
+                with phase("solve"):
+                    vm = np.abs(self.voltage_vector())
+                    delta_voltages = fdlf.calc_voltage_update(mismatches[n_pv_pq:], vm)
+                with phase("update"):
+                    self.update_state([], delta_voltages)
+            if trace is not None:
+                trace.end_iteration()
+
+        return self.report_result(level, self.make_result(method, False, max_iterations,
+                                                          self.compute_power_mismatch(), history, start, trace,
+                                                          first_record))
+
+    def report_result(self, level, result):
+        if level >= SUMMARY:
+            print(result.report())
+        return result
+
+    def update_state(self, delta_angles, delta_voltages):
+        # update angles for PV and PQ buses and voltages for PQ buses only
+        for i, d in zip(self.pv_pq, delta_angles):
+            self.angles[self.bus_names[i]] += d
+
+        for i, d in zip(self.pq, delta_voltages):
+            self.voltages[self.bus_names[i]] += d
+
+    def power_flow(self, tolerance=0.001, max_iterations=50, sparse=False, method="newton", variant="XB", verbose=True,
+                   trace=None, dishonest=False, reduction_threshold=0.25, step_control=None, divergence_limit=None,
+                   stall_iterations=None, min_step=1e-3):
+        # method selects the solver: "newton" (full Newton-Raphson) or "fast_decoupled" (XB or BX variant)
+        # returns a PowerFlowResult; with verbose=0 nothing is printed at all
+        # the Newton-Raphson options are described in newton_raphson; divergence_limit and
+        # stall_iterations are off by default, so only a non-finite mismatch ends a solve early
+        if method == "newton":
+            return self.newton_raphson(tolerance=tolerance, max_iterations=max_iterations, sparse=sparse,
+                                       verbose=verbose, trace=trace, dishonest=dishonest,
+                                       reduction_threshold=reduction_threshold, step_control=step_control,
+                                       divergence_limit=divergence_limit, stall_iterations=stall_iterations,
+                                       min_step=min_step)
+        elif method == "fast_decoupled":
+            return self.fast_decoupled(tolerance=tolerance, max_iterations=max_iterations, variant=variant,
+                                       verbose=verbose, trace=trace)
+        else:
+            raise ValueError(f"Invalid power flow method: {method}")
 
     def sequence_to_phase(self, V0, V1, V2):
         a = np.exp(1j * 2 * np.pi / 3)
@@ -227,18 +397,9 @@ class Solution:
         print("\nFAULT ANALYSIS")
         print("=" * 60)
 
-        # Ensure latest Ybus and Zbus matrices are calculated
-        self.circuit.ybus = self.circuit.calc_ybus()
-        self.circuit.ybus_pos = self.circuit.calc_ybus_pos_sequence()
-        self.circuit.ybus_neg = self.circuit.calc_ybus_neg_sequence()
-        self.circuit.ybus_zero = self.circuit.calc_ybus_zero_sequence()
-        self.circuit.zbus_pos, self.circuit.zbus_neg, self.circuit.zbus_zero = self.circuit.calc_sequence_zbuses()
-
-        # Update the references in the Solution object
-        self.ybus = self.circuit.ybus
-        self.zbus_pos = self.circuit.zbus_pos
-        self.zbus_neg = self.circuit.zbus_neg
-        self.zbus_zero = self.circuit.zbus_zero
+        # Sequence networks and Zbus matrices are cached on the Circuit and only
+        # rebuilt if an element in that network changed since they were last calculated
+        self.circuit.calc_sequence_zbuses()
 
         print("Select fault type:")
         print("1. Three-phase fault")
@@ -268,29 +429,39 @@ class Solution:
         else:
             print("Invalid choice.")
 
+    def fault_sweep(self, buses=None, fault_types=None, v_prefault=1.0 + 0.0j, Zf=0 + 0j):
+        # non-interactive short-circuit table: every fault type in fault_types ("3ph", "lg", "ll", "llg")
+        # at every bus in buses (default: all); returns (currents, voltages) DataFrames
+        from FaultSweep import FaultSweep
+        return FaultSweep(self.circuit, v_prefault, Zf).run(buses, fault_types)
+
     def perform_symmetrical_fault(self, bus, v_prefault):
         print("\n>>> Performing symmetrical 3-phase fault analysis")
-        Znn = self.zbus_pos.loc[bus, bus]
+        n = self.circuit.bus_index[bus]
+        z1 = self.zbus_pos.column(bus)  # column n of each Zbus, one solve per sequence
+        Znn = z1[n]
         If = v_prefault / Znn
         print(f"\nSubtransient fault current at {bus}: {abs(If):.4f} p.u. ∠{np.angle(If, deg=True):.2f}°")
 
         voltages_abc = {}
         
-        for k in self.zbus_pos.index:
-            Zkn = self.zbus_pos.loc[k, bus]
+        for i, k in enumerate(self.circuit.buses):
+            Zkn = z1[i]
             V1_k = v_prefault - Zkn * If
             V0_k = 0
             V2_k = 0
-           Va, Vb, Vc = self.sequence_to_phase(V0_k, V1_k, V2_k)
+            Va, Vb, Vc = self.sequence_to_phase(V0_k, V1_k, V2_k)
             voltages_abc[k] = (Va, Vb, Vc)
 
         self.print_fault_voltage_table("Three-Phase Fault", voltages_abc)
         
     def perform_lg_fault(self, bus, v_prefault, Zf):
         print("\n>>> Performing line‑to‑ground (LG) fault analysis")
-        Z1_nn = self.zbus_pos.loc[bus, bus]
-        Z2_nn = self.zbus_neg.loc[bus, bus]
-        Z0_nn = self.zbus_zero.loc[bus, bus]
+        n = self.circuit.bus_index[bus]
+        z1, z2, z0 = self.zbus_pos.column(bus), self.zbus_neg.column(bus), self.zbus_zero.column(bus)
+        Z1_nn = z1[n]
+        Z2_nn = z2[n]
+        Z0_nn = z0[n]
         Z_total = Z1_nn + Z2_nn + Z0_nn + 3 * Zf
         I1 = I2 = I0 = v_prefault / Z_total
         Ia, _, _ = self.sequence_to_phase(I0, I1, I2)
@@ -298,10 +469,10 @@ class Solution:
 
         voltages_abc = {}
         
-        for k in self.circuit.buses:
-            Z1_kn = self.zbus_pos.loc[k, bus]
-            Z2_kn = self.zbus_neg.loc[k, bus]
-            Z0_kn = self.zbus_zero.loc[k, bus]
+        for i, k in enumerate(self.circuit.buses):
+            Z1_kn = z1[i]
+            Z2_kn = z2[i]
+            Z0_kn = z0[i]
             V1_k = v_prefault - Z1_kn * I1
             V2_k = -Z2_kn * I2
             V0_k = -Z0_kn * I0
@@ -312,8 +483,10 @@ class Solution:
         
     def perform_ll_fault(self, bus, v_prefault, Zf):
         print("\n>>> Performing line‑to‑line fault analysis")
-        Z1_nn = self.zbus_pos.loc[bus, bus]
-        Z2_nn = self.zbus_neg.loc[bus, bus]
+        n = self.circuit.bus_index[bus]
+        z1, z2 = self.zbus_pos.column(bus), self.zbus_neg.column(bus)
+        Z1_nn = z1[n]
+        Z2_nn = z2[n]
         Z_total = Z1_nn + Z2_nn + Zf
         I1 = v_prefault / Z_total
         I2 = -I1
@@ -323,10 +496,9 @@ class Solution:
 
         voltages_abc = {}
         
-        for k in self.circuit.buses:
-            Z1_kn = self.zbus_pos.loc[k, bus]
-            Z2_kn = self.zbus_neg.loc[k, bus]
-            Z0_kn = self.zbus_zero.loc[k, bus]
+        for i, k in enumerate(self.circuit.buses):
+            Z1_kn = z1[i]
+            Z2_kn = z2[i]
             V1_k = v_prefault - Z1_kn * I1
             V2_k = -Z2_kn * I2
             V0_k = 0
@@ -337,9 +509,11 @@ class Solution:
     
     def perform_llg_fault(self, bus, v_prefault, Zf):
         print("\n>>> Performing double line-to-ground (LLG) fault analysis")
-        Z1_nn = self.zbus_pos.loc[bus, bus]
-        Z2_nn = self.zbus_neg.loc[bus, bus]
-        Z0_nn = self.zbus_zero.loc[bus, bus]
+        n = self.circuit.bus_index[bus]
+        z1, z2, z0 = self.zbus_pos.column(bus), self.zbus_neg.column(bus), self.zbus_zero.column(bus)
+        Z1_nn = z1[n]
+        Z2_nn = z2[n]
+        Z0_nn = z0[n]
         Z_total1 = Z1_nn + (Z2_nn * (Z0_nn + 3 * Zf)) / (Z2_nn + Z0_nn + 3 * Zf)
         I1 = v_prefault / Z_total1
         I2 = -I1 * (Z0_nn + 3 * Zf) / (Z2_nn + Z0_nn + 3 * Zf)
@@ -349,10 +523,10 @@ class Solution:
 
         voltages_abc = {}
 
-        for k in self.circuit.buses:
-            Z1_kn = self.zbus_pos.loc[k, bus]
-            Z2_kn = self.zbus_neg.loc[k, bus]
-            Z0_kn = self.zbus_zero.loc[k, bus]
+        for i, k in enumerate(self.circuit.buses):
+            Z1_kn = z1[i]
+            Z2_kn = z2[i]
+            Z0_kn = z0[i]
             V1_k = v_prefault - Z1_kn * I1
             V2_k = -Z2_kn * I2
             V0_k = -Z0_kn * I0
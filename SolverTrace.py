@@ -0,0 +1,143 @@
+# Group 8 - Project 2
+# ECE 2774
+# Solver Instrumentation
+
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+import numpy as np
+import pandas as pd
+
+
+def null_phase(name):
+    # stand-in for SolverTrace.phase when a solver runs without a trace
+    return nullcontext()
+
+
+class SolverTrace:
+
+    def __init__(self, callback=None, count_allocations: bool = False):
+        # passed to a solver as trace=...; records the wall time of every phase of every iteration
+        # (mismatch, jacobian, solve, update), the mismatch norms and, when the solver has them, the
+        # nnz of J and of its LU factors
+        # callback(record) is called at the end of each iteration with that iteration's record
+        # count_allocations traces Python/NumPy memory allocations per phase with tracemalloc,
+        # which slows the solver down noticeably; the solvers call close() when they finish, which
+        # stops tracemalloc again unless it was already running before the trace started it
+        self.callback = callback
+        self.count_allocations = count_allocations
+        self.started_tracemalloc = False
+        self.start = time.perf_counter()
+        self.iterations = []  # one record (dict) per iteration
+        self.events = []  # Chrome trace events
+        self.record = None  # iteration in progress
+
+    def timestamp(self, t):
+        # microseconds since the trace was created, as the Chrome trace format expects
+        return (t - self.start) * 1e6
+
+    def start_iteration(self, solver: str, iteration: int):
+        self.record = {"solver": solver, "iteration": iteration, "max_mismatch": np.nan, "mismatch_norm": np.nan,
+                       "phases": {}, "allocated": {}, "t0": time.perf_counter()}
+
+    @contextmanager
+    def phase(self, name: str):
+        # times the enclosed block as one phase of the current iteration
+        if self.count_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.started_tracemalloc = True
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            t1 = time.perf_counter()
+            record = self.record
+            record["phases"][name] = record["phases"].get(name, 0.0) + (t1 - t0)
+            args = {"iteration": record["iteration"]}
+            if self.count_allocations:
+                allocated = tracemalloc.get_traced_memory()[1] - before
+                record["allocated"][name] = record["allocated"].get(name, 0) + allocated
+                args["allocated_bytes"] = allocated
+            self.events.append({"name": name, "cat": record["solver"], "ph": "X", "ts": self.timestamp(t0),
+                                "dur": (t1 - t0) * 1e6, "pid": os.getpid(), "tid": 0, "args": args})
+            if failed:
+                self.close()  # the solver raised and will not reach its own close()
+
+    def close(self):
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def note(self, **values):
+        # extra per-iteration values a solver wants on the record (e.g. jacobian_reused)
+        self.record.update(values)
+
+    def mismatch(self, mismatches):
+        self.record["max_mismatch"] = float(np.max(np.abs(mismatches))) if len(mismatches) else 0.0
+        self.record["mismatch_norm"] = float(np.linalg.norm(mismatches))
+
+    def matrix(self, J, lu=None):
+        # nnz of J and, for a sparse LU, of its factors (fill-in = factor nnz beyond J's own)
+        self.record["jacobian_nnz"] = int(J.nnz if hasattr(J, "nnz") else np.count_nonzero(J))
+        if lu is not None and lu.lu is not None:
+            factor_nnz = lu.lu.L.nnz + lu.lu.U.nnz - J.shape[0]  # unit diagonal of L not counted twice
+            self.record["factor_nnz"] = int(factor_nnz)
+            self.record["fill_in"] = int(factor_nnz - self.record["jacobian_nnz"])
+
+    def end_iteration(self):
+        record = self.record
+        t0 = record.pop("t0")
+        t1 = time.perf_counter()
+        record["time"] = t1 - t0
+        if not self.count_allocations:
+            del record["allocated"]
+        self.iterations.append(record)
+        # iterations without a mismatch (solver setup) get no counter value; NaN is not valid JSON
+        args = {} if np.isnan(record["max_mismatch"]) else {"max_mismatch": record["max_mismatch"]}
+        self.events.append({"name": f"{record['solver']} iteration {record['iteration']}", "cat": record["solver"],
+                            "ph": "X", "ts": self.timestamp(t0), "dur": (t1 - t0) * 1e6, "pid": os.getpid(),
+                            "tid": 1, "args": args})
+        if args:
+            self.events.append({"name": "max_mismatch", "ph": "C", "ts": self.timestamp(t1), "pid": os.getpid(),
+                                "args": args})
+        self.record = None
+        if self.callback is not None:
+            self.callback(record)
+
+    def to_dataframe(self):
+        # one row per iteration: mismatch norms, seconds per phase, matrix counters and allocations
+        rows = []
+        for record in self.iterations:
+            row = {key: value for key, value in record.items() if key not in ("phases", "allocated")}
+            row.update(record["phases"])
+            row.update({f"{name}_allocated": value for name, value in record.get("allocated", {}).items()})
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def phase_totals(self):
+        # total seconds per phase over all iterations and the share of the total each one takes
+        totals = {}
+        for record in self.iterations:
+            for name, seconds in record["phases"].items():
+                totals[name] = totals.get(name, 0.0) + seconds
+        totals = pd.Series(totals, name="seconds", dtype=float)
+        return pd.DataFrame({"seconds": totals, "share": totals / totals.sum()})
+
+    def write_chrome_trace(self, path: str):
+        # timeline viewable in chrome://tracing or Perfetto: phases on thread 0, whole iterations
+        # on thread 1 and the max mismatch as a counter track
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,90 @@
+# Group 8 - Project 2
+# ECE 2774
+# Sparse LU Solver
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.linalg import lu_factor, lu_solve
+from scipy.sparse.linalg import splu, spsolve_triangular
+
+
+class SparseLU:
+
+    def __init__(self):
+        self.lu = None
+        self.factorizations = 0
+
+    def factorize(self, A):
+        # SuperLU factorization of A with a COLAMD fill-reducing column ordering
+        self.lu = splu(sp.csc_matrix(A), permc_spec="COLAMD")
+        self.factorizations += 1
+        return self
+
+    def solve(self, b):
+        return self.lu.solve(np.asarray(b))
+
+    def export_factors(self):
+        # the current factorization as plain L, U and permutation arrays
+        return TriangularFactors(self.lu.L.tocsr(), self.lu.U.tocsr(), self.lu.perm_r, self.lu.perm_c)
+
+
+class DenseLU:
+
+    def __init__(self):
+        # same factorize/solve interface as SparseLU for dense matrices (LAPACK getrf/getrs),
+        # so a factorization can be kept and solved against more than once
+        self.lu = None
+        self.factorizations = 0
+
+    def factorize(self, A):
+        lu, piv = lu_factor(np.asarray(A), check_finite=False)
+        if np.any(np.diag(lu) == 0):
+            raise np.linalg.LinAlgError("Singular matrix")
+        self.lu = (lu, piv)
+        self.factorizations += 1
+        return self
+
+    def solve(self, b):
+        return lu_solve(self.lu, np.asarray(b), check_finite=False)
+
+
+class TriangularFactors:
+
+    # names of the arrays needed to rebuild the factors, see arrays()
+    ARRAY_NAMES = ("L_data", "L_indices", "L_indptr", "U_data", "U_indices", "U_indptr", "perm_r", "perm_c")
+
+    def __init__(self, L, U, perm_r, perm_c):
+        # Pr A Pc = L U with L unit lower triangular, both in CSR format; unlike a SuperLU
+        # object these can be written to disk or shared between processes as plain arrays
+        self.L = L
+        self.U = U
+        self.perm_r = perm_r
+        self.perm_c = perm_c
+        self.N = L.shape[0]
+
+    def solve(self, b):
+        # x = Pc U^-1 L^-1 Pr b
+        b = np.asarray(b)
+        pb = np.empty(b.shape, dtype=np.result_type(b, self.L.dtype))
+        pb[self.perm_r] = b
+        y = spsolve_triangular(self.L, pb, lower=True, unit_diagonal=True)
+        y = spsolve_triangular(self.U, y, lower=False)
+        return y[self.perm_c]
+
+    def export_factors(self):
+        return self
+
+    def arrays(self):
+        return {
+            "L_data": self.L.data, "L_indices": self.L.indices, "L_indptr": self.L.indptr,
+            "U_data": self.U.data, "U_indices": self.U.indices, "U_indptr": self.U.indptr,
+            "perm_r": self.perm_r, "perm_c": self.perm_c,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        # rebuild without copying: the CSR matrices are views on the given arrays
+        N = len(arrays["perm_r"])
+        L = sp.csr_matrix((arrays["L_data"], arrays["L_indices"], arrays["L_indptr"]), shape=(N, N), copy=False)
+        U = sp.csr_matrix((arrays["U_data"], arrays["U_indices"], arrays["U_indptr"]), shape=(N, N), copy=False)
+        return cls(L, U, arrays["perm_r"], arrays["perm_c"])
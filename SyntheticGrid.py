@@ -0,0 +1,100 @@
+# Group 8 - Project 2
+# ECE 2774
+# Synthetic Test Grid Generator
+
+import numpy as np
+from Circuit import Circuit
+
+# tower configurations: (name, xa, ya, xb, yb, xc, yc) in feet
+GEOMETRIES = (("Flat", 0, 0, 18.5, 0, 37, 0),
+              ("Triangle", 0, 0, 20, 0, 10, 17),
+              ("Vertical", 0, 0, 0, 15, 0, 30))
+
+
+class SyntheticGrid:
+
+    def __init__(self, num_buses: int, seed: int = 0, chord_fraction: float = 0.1, buses_per_generator: int = 25,
+                 loss_factor: float = 1.01, line_kv: float = 230, gen_kv: float = 20):
+        # meshed test system of num_buses buses built from the regular element models:
+        #   - a near-square lattice of line_kv buses joined by lines (right and down neighbours),
+        #     plus diagonal chords on chord_fraction of the lattice cells to make it meshed
+        #   - one gen_kv generator bus per buses_per_generator buses, each behind a delta-y step-up
+        #     transformer, spread evenly over the lattice
+        #   - a load on every lattice bus; each generator supplies the load of the lattice buses
+        #     nearest to it times loss_factor, so power flows stay local at any grid size
+        #   - the slack is the middle generator, its transformer sized to carry 10% of the total
+        #     load so it can absorb whatever the loss estimate misses
+        # the same num_buses and seed always give the same circuit
+        if num_buses < 2:
+            raise ValueError("A synthetic grid needs at least 2 buses.")
+        self.num_buses = num_buses
+        self.seed = seed
+        self.chord_fraction = chord_fraction
+        self.num_generators = max(1, num_buses // buses_per_generator)
+        self.num_grid_buses = num_buses - self.num_generators
+        self.width = int(np.ceil(np.sqrt(self.num_grid_buses)))
+        self.line_kv = line_kv
+        self.gen_kv = gen_kv
+        self.loss_factor = loss_factor
+
+    def lattice_branches(self, rng):
+        # (from, to) lattice positions of every line; row-major numbering, so every bus of a partly
+        # filled last row still has a neighbour above it and the lattice stays connected
+        n, w = self.num_grid_buses, self.width
+        k = np.arange(n)
+        right = k[(k % w < w - 1) & (k + 1 < n)]
+        down = k[k + w < n]
+        diagonal = k[(k % w < w - 1) & (k + w + 1 < n)]
+        diagonal = diagonal[rng.random(diagonal.size) < self.chord_fraction]
+
+        f = np.concatenate((right, down, diagonal))
+        t = np.concatenate((right + 1, down + w, diagonal + w + 1))
+        return f, t
+
+    def build(self, name: str = None):
+        rng = np.random.default_rng(self.seed)
+        circuit = Circuit(name or f"Synthetic {self.num_buses}")
+        n, G = self.num_grid_buses, self.num_generators
+
+        grid_buses = [f"Bus{k + 1}" for k in range(n)]
+        gen_buses = [f"Bus{n + k + 1}" for k in range(G)]
+        circuit.add_bus_many(grid_buses + gen_buses, [self.line_kv] * n + [self.gen_kv] * G)
+
+        circuit.add_conductor("Partridge", 0.642, 0.0217, 0.385, 460)
+        circuit.add_conductor("Drake", 1.108, 0.0375, 0.1288, 907)
+        circuit.add_bundle("Bundle1", 2, 1.5, "Partridge")
+        circuit.add_bundle("Bundle2", 2, 1.5, "Drake")
+        for geometry in GEOMETRIES:
+            circuit.add_geometry(*geometry)
+
+        f, t = self.lattice_branches(rng)
+        M = f.size
+        bundles = np.array(["Bundle1", "Bundle2"])[rng.integers(0, 2, M)]
+        geometries = np.array([g[0] for g in GEOMETRIES])[rng.integers(0, len(GEOMETRIES), M)]
+        circuit.add_tline_many([f"Line{k + 1}" for k in range(M)], [grid_buses[i] for i in f],
+                               [grid_buses[i] for i in t], bundles, geometries, rng.uniform(2, 10, M))
+
+        # generators spread evenly over the lattice, each with its own step-up transformer
+        points = np.linspace(0, n - 1, G).astype(int)
+        real_power = rng.uniform(5, 15, n)
+        region = np.searchsorted((points[1:] + points[:-1]) / 2, np.arange(n))
+        mw = self.loss_factor * np.bincount(region, real_power, G)
+        rating = np.maximum(100, np.ceil(1.25 * mw / 50) * 50)
+        slack = G // 2
+        rating[slack] = max(rating[slack], np.ceil(0.1 * real_power.sum() / 50) * 50)
+        circuit.add_transformer_many([f"T{k + 1}" for k in range(G)], gen_buses, [grid_buses[i] for i in points],
+                                     rating, np.full(G, 10.5), np.full(G, 12), "delta-y", 1)
+        circuit.add_generator_many([f"G{k + 1}" for k in range(G)], gen_buses, np.full(G, self.gen_kv), mw, 0)
+        circuit.set_slack_bus(gen_buses[slack])
+
+        circuit.add_load_many([f"L{k + 1}" for k in range(n)], grid_buses, real_power,
+                              real_power * rng.uniform(0.2, 0.4, n))
+
+        return circuit
+
+
+if __name__ == "__main__":
+    for size in (10, 100, 1000):
+        circuit = SyntheticGrid(size).build()
+        print(circuit.name, len(circuit.buses), "buses", len(circuit.transmissionlines), "lines",
+              len(circuit.transformers), "transformers", len(circuit.generators), "generators")
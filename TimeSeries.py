@@ -0,0 +1,92 @@
+# Group 8 - Project 2
+# ECE 2774
+# Quasi-Static Time-Series Power Flow
+
+import numpy as np
+from Solution import Solution
+from SystemSettings import SystemSettings
+
+
+class TimeSeries:
+
+    def __init__(self, circuit, load_p=None, load_q=None, gen_p=None, tolerance: float = 0.001,
+                 max_iterations: int = 20, sparse: bool = True, divergence_limit: float = 1e4,
+                 stall_iterations: int = 10):
+        # load_p / load_q / gen_p: per-timestep MW, MVAR and MW setpoint profiles keyed by load or
+        # generator name (a dict of arrays or a DataFrame with one column per element); elements
+        # without a profile keep their values from the Circuit
+        # one Solution is reused for every step, so the Ybus and the Jacobian pattern are built once
+        # and each step is warm-started from the previous one
+        # divergence_limit and stall_iterations (see Solution.newton_raphson) end a diverging step
+        # early; it then restarts from the previous step's state anyway
+        self.circuit = circuit
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.sparse = sparse
+        self.divergence_limit = divergence_limit
+        self.stall_iterations = stall_iterations
+
+        self.solution = Solution(circuit)
+        self.bus_names = self.solution.bus_names
+        self.base_p, self.base_q = self.solution.p_specified.copy(), self.solution.q_specified.copy()
+
+        # (bus index, sign, base value, profile) per profiled element, grouped by injection
+        self.p_profiles = (self.calc_profiles(circuit.loads, load_p, "real_power", -1)
+                           + self.calc_profiles(circuit.generators, gen_p, "mw_setpoint", 1))
+        self.q_profiles = self.calc_profiles(circuit.loads, load_q, "reactive_power", -1)
+
+        lengths = {len(profile) for _, _, _, profile in self.p_profiles + self.q_profiles}
+        if len(lengths) > 1:
+            raise ValueError("All profiles must have the same number of timesteps.")
+        self.steps = lengths.pop() if lengths else 0
+
+    def calc_profiles(self, elements, profiles, attribute, sign):
+        if profiles is None:
+            return []
+
+        bus_index = {name: idx for idx, name in enumerate(self.bus_names)}
+        result = []
+        for name, values in profiles.items():
+            if name not in elements:
+                raise ValueError(f"'{name}' is not a load or generator in the circuit.")
+            element = elements[name]
+            result.append((bus_index[element.bus.name], sign, getattr(element, attribute),
+                           np.asarray(values, dtype=float)))
+        return result
+
+    def calc_step_injection(self, base, profiles, step):
+        # base specified injection plus the change of every profiled element at this step
+        injection = base.copy()
+        for idx, sign, base_value, profile in profiles:
+            injection[idx] += sign * (profile[step] - base_value) / SystemSettings.Sbase
+        return injection
+
+    def iter_steps(self, start: int = 0, stop: int = None):
+        # yields (step, converged, |V|, angle in radians) one timestep at a time; a step that does
+        # not converge leaves the next one to start from the last converged voltages
+        solution = self.solution
+        stop = self.steps if stop is None else stop
+
+        for step in range(start, stop):
+            solution.p_specified = self.calc_step_injection(self.base_p, self.p_profiles, step)
+            solution.q_specified = self.calc_step_injection(self.base_q, self.q_profiles, step)
+
+            previous = dict(solution.voltages), dict(solution.angles)
+            converged = solution.newton_raphson(self.tolerance, self.max_iterations, sparse=self.sparse,
+                                                verbose=False, divergence_limit=self.divergence_limit,
+                                                stall_iterations=self.stall_iterations).converged
+            V = solution.voltage_vector()
+            if not converged:
+                solution.warm_start(*previous)
+
+            yield step, converged, np.abs(V), np.angle(V)
+
+    def write_csv(self, path: str, start: int = 0, stop: int = None):
+        # streams every step to a CSV file as it is solved: step, converged, then |V| and the
+        # angle in degrees of each bus
+        with open(path, "w") as f:
+            f.write(",".join(["step", "converged"] + [f"V_{b}" for b in self.bus_names]
+                             + [f"delta_{b}" for b in self.bus_names]) + "\n")
+            for step, converged, vm, va in self.iter_steps(start, stop):
+                values = np.concatenate((vm, np.degrees(va)))
+                f.write(f"{step},{int(converged)}," + ",".join(f"{v:.6f}" for v in values) + "\n")
@@ -8,6 +8,9 @@ from SystemSettings import SystemSettings
 
 class Transformer:
 
+    __slots__ = ("name", "bus1", "bus2", "power_rating", "impedance_percent", "x_over_r_ratio",
+                 "connection_type", "Zn", "Rpusys", "Xpusys", "Yseries", "yprim", "yprim_neg", "yprim_zero")
+
     def __init__(self, name: str, bus1: Bus, bus2: Bus, power_rating: float,
                  impedance_percent: float, x_over_r_ratio: float, connection_type: str, grounding_impedance: float):
         self.name = name
@@ -25,7 +28,7 @@ class Transformer:
         self.Rpusys, self.Xpusys = self.calc_impedance()
         self.Yseries = self.calc_admittance()
 
-        # sequence admittances
+        # sequence admittances, 2x2 complex arrays in (bus1, bus2) order
         self.yprim = self.calc_yprim()
         self.yprim_neg = self.calc_yprim_negative()
         self.yprim_zero = self.calc_yprim_zero()
@@ -49,18 +52,16 @@ class Transformer:
             [self.Yseries, -self.Yseries],
             [-self.Yseries, self.Yseries]
         ])
-        yprim_df = pd.DataFrame(yprim, index=[self.bus1.name, self.bus2.name], columns=[self.bus1.name, self.bus2.name])
 
-        return yprim_df
+        return yprim
 
     def calc_yprim_negative(self):
         # equal to positive sequence
 
-        yprim_2 = np.array([
+        yprim_neg = np.array([
             [self.Yseries, -self.Yseries],
             [-self.Yseries, self.Yseries]
         ])
-        yprim_neg = pd.DataFrame(yprim_2, index=[self.bus1.name, self.bus2.name], columns=[self.bus1.name, self.bus2.name])
 
         return yprim_neg
 
@@ -90,11 +91,13 @@ class Transformer:
         else:
             raise ValueError(f"Invalid connection type: {self.connection_type}")
 
-        yprim_zero = pd.DataFrame([[y11, -y12], [-y12, y22]],
-                                  index=[self.bus1.name, self.bus2.name],
-                                  columns=[self.bus1.name, self.bus2.name])
+        yprim_zero = np.array([[y11, -y12], [-y12, y22]], dtype=complex)
         return yprim_zero
 
+    def to_dataframe(self, yprim):
+        # labelled view of one of the primitive matrices, only built for printing
+        return pd.DataFrame(yprim, index=[self.bus1.name, self.bus2.name], columns=[self.bus1.name, self.bus2.name])
+
 
 # Validation
 if __name__ == "__main__":
@@ -112,10 +115,10 @@ if __name__ == "__main__":
     print("Series Admittance (Yseries):", transformer1.Yseries)
 
     print("\nPositive Sequence Yprim:")
-    print(transformer1.yprim)
+    print(transformer1.to_dataframe(transformer1.yprim))
 
     print("\nNegative Sequence Yprim:")
-    print(transformer1.yprim_neg)
+    print(transformer1.to_dataframe(transformer1.yprim_neg))
 
     print("\nZero Sequence Yprim:")
-    print(transformer1.yprim_zero)
\ No newline at end of file
+    print(transformer1.to_dataframe(transformer1.yprim_zero))
\ No newline at end of file
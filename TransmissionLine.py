@@ -13,7 +13,13 @@ from SystemSettings import SystemSettings
 
 class TransmissionLine:
 
-    def __init__(self, name: str, bus1: Bus, bus2: Bus, bundle: Bundle, geometry: Geometry, length: float):
+    __slots__ = ("name", "bus1", "bus2", "bundle", "geometry", "length", "zbase", "ybase",
+                 "Rpu", "Xpu", "Bpu", "R2pu", "X2pu", "B2pu", "R0pu", "X0pu", "B0pu",
+                 "yprim", "yprim_neg", "yprim_zero")
+
+    def __init__(self, name: str, bus1: Bus, bus2: Bus, bundle: Bundle, geometry: Geometry, length: float,
+                 constants: tuple = None):
+        # constants: precomputed (Rpu, Xpu, Bpu), e.g. from a LineConstants batch, to skip the scalar calculation
         self.name = name
         self.bus1 = bus1
         self.bus2 = bus2
@@ -24,9 +30,12 @@ class TransmissionLine:
         self.zbase, self.ybase = self.calc_base_values()
 
         # positive-sequence parameters
-        self.Rpu = self.calc_Rpu()
-        self.Xpu = self.calc_Xpu()
-        self.Bpu = self.calc_Bpu()
+        if constants is not None:
+            self.Rpu, self.Xpu, self.Bpu = (float(c) for c in constants)
+        else:
+            self.Rpu = self.calc_Rpu()
+            self.Xpu = self.calc_Xpu()
+            self.Bpu = self.calc_Bpu()
 
         # Negative-sequence (same as pos)
         self.R2pu = self.Rpu
@@ -38,7 +47,7 @@ class TransmissionLine:
         self.X0pu = 2.5 * self.Xpu
         self.B0pu = self.Bpu
 
-        # admittance matrices
+        # admittance matrices, 2x2 complex arrays in (bus1, bus2) order
         self.yprim = self.calc_yprim()
         self.yprim_neg = self.calc_yprim_negative_sequence()
         self.yprim_zero = self.calc_yprim_zero_sequence()
@@ -102,12 +111,8 @@ class TransmissionLine:
         yshunt = complex(G, self.Bpu)
 
         # primitive admittance matrix (2x2 for a single line)
-        Y_prim = pd.DataFrame(
-            [[yseries + yshunt / 2, -1*yseries],
-             [-1*yseries, yseries + yshunt/ 2]],
-            index=[self.bus1.name, self.bus2.name],
-            columns=[self.bus1.name, self.bus2.name]
-        )
+        Y_prim = np.array([[yseries + yshunt / 2, -1*yseries],
+                             [-1*yseries, yseries + yshunt/ 2]])
 
         return Y_prim
 
@@ -120,12 +125,8 @@ class TransmissionLine:
         yshunt = complex(G, self.B2pu)
 
         # primitive admittance matrix (2x2 for a single line)
-        Y_prim_neg = pd.DataFrame(
-            [[yseries + yshunt / 2, -1*yseries],
-             [-1*yseries, yseries + yshunt/ 2]],
-            index=[self.bus1.name, self.bus2.name],
-            columns=[self.bus1.name, self.bus2.name]
-        )
+        Y_prim_neg = np.array([[yseries + yshunt / 2, -1*yseries],
+                             [-1*yseries, yseries + yshunt/ 2]])
 
         return Y_prim_neg
 
@@ -138,15 +139,15 @@ class TransmissionLine:
         yshunt = complex(G, self.B0pu)
 
         # primitive admittance matrix (2x2 for a single line)
-        Y_prim_zero = pd.DataFrame(
-            [[yseries + yshunt / 2, -1*yseries],
-             [-1*yseries, yseries + yshunt/ 2]],
-            index=[self.bus1.name, self.bus2.name],
-            columns=[self.bus1.name, self.bus2.name]
-        )
+        Y_prim_zero = np.array([[yseries + yshunt / 2, -1*yseries],
+                             [-1*yseries, yseries + yshunt/ 2]])
 
         return Y_prim_zero
 
+    def to_dataframe(self, yprim):
+        # labelled view of one of the primitive matrices, only built for printing
+        return pd.DataFrame(yprim, index=[self.bus1.name, self.bus2.name], columns=[self.bus1.name, self.bus2.name])
+
 if __name__ == "__main__":
 
     conductor1 = Conductor("Partridge", 0.642, 0.0217, 0.385, 460)
@@ -167,9 +168,9 @@ if __name__ == "__main__":
     print(line1.Rpu, line1.Xpu, line1.Bpu)
 
     print("\nPositive Sequence Yprim:")
-    print(line1.yprim)
+    print(line1.to_dataframe(line1.yprim))
     print("\nNegative Sequence Yprim:")
-    print(line1.yprim_neg)
+    print(line1.to_dataframe(line1.yprim_neg))
     print("\nZero Sequence Yprim:")
-    print(line1.yprim_zero)
+    print(line1.to_dataframe(line1.yprim_zero))
 
@@ -0,0 +1,157 @@
+# Group 8 - Project 2
+# ECE 2774
+# Sparse Ybus Assembly
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from TransmissionLine import TransmissionLine
+from Transformer import Transformer
+from Generator import Generator
+from Load import Load
+
+
+class YbusBuilder:
+
+    def __init__(self, circuit):
+        self.circuit = circuit
+        self.bus_index = circuit.bus_index  # bus name -> row/column, maintained by the Circuit
+        self.N = len(circuit.buses)
+
+    @property
+    def bus_names(self):
+        return list(self.circuit.buses.keys())
+
+    @property
+    def model(self):
+        # compiled lazily, element_stamps does not need it
+        return self.circuit.calc_network_model()
+
+    def branch_parameters(self):
+        # series R, X and total line-charging B (p.u.) of every line and transformer
+        model = self.model
+        return model.from_bus, model.to_bus, model.r, model.x, model.b
+
+    def pi_model_triplets(self, f, t, r, x, b):
+        # COO triplets of the pi-model stamps built from per-branch R, X and B arrays
+        yseries = 1 / (r + 1j * x)
+        yshunt = 1j * b / 2
+
+        rows = np.concatenate((f, f, t, t))
+        cols = np.concatenate((f, t, f, t))
+        vals = np.concatenate((yseries + yshunt, -yseries, -yseries, yseries + yshunt))
+
+        return rows, cols, vals
+
+    def assemble(self, *triplets):
+        # one vectorized pass: duplicate (row, col) entries are summed by the COO -> CSR conversion
+
+        rows = np.concatenate([t[0] for t in triplets])
+        cols = np.concatenate([t[1] for t in triplets])
+        vals = np.concatenate([t[2] for t in triplets])
+
+        ybus = sp.coo_matrix((vals, (rows, cols)), shape=(self.N, self.N)).tocsr()
+        ybus.sum_duplicates()
+        return ybus
+
+    def build_network_matrices(self):
+        # single sweep over every element: the power flow Ybus and the positive, negative and
+        # zero-sequence stamps are gathered together so all four matrices share one set of
+        # index arrays and one CSR pattern
+
+        branches = list(self.circuit.transmissionlines.values()) + list(self.circuit.transformers.values())
+        generators = list(self.circuit.generators.values())
+        loads = list(self.circuit.loads.values())
+        M, G, L = len(branches), len(generators), len(loads)
+
+        model = self.model
+        f, t, g, l = model.from_bus, model.to_bus, model.gen_bus, model.load_bus
+
+        # branch primitives, shape (M, 3, 2, 2) in (pos, neg, zero) order
+        prims = np.array([(br.yprim, br.yprim_neg, br.yprim_zero) for br in branches],
+                         dtype=complex).reshape(M, 3, 2, 2)
+        gen_y = np.array([(gen.y_prim_positive_sequence(), gen.y_prim_negative_sequence(),
+                           gen.y_prim_zero_sequence()) for gen in generators], dtype=complex).reshape(G, 3)
+        load_y = np.array([load.y_prim() for load in loads], dtype=complex)
+
+        rows = np.concatenate((f, f, t, t, g, l))
+        cols = np.concatenate((f, t, f, t, g, l))
+
+        # one row of values per network: Ybus (branches only), pos, neg, zero;
+        # loads are not part of the zero-sequence network
+        vals = np.zeros((4, rows.size), dtype=complex)
+        for seq in range(3):
+            vals[seq + 1] = np.concatenate((prims[:, seq, 0, 0], prims[:, seq, 0, 1], prims[:, seq, 1, 0],
+                                            prims[:, seq, 1, 1], gen_y[:, seq],
+                                            load_y if seq < 2 else np.zeros(L, dtype=complex)))
+        vals[0, :4 * M] = vals[1, :4 * M]
+
+        ybus, ybus_pos, ybus_neg, ybus_zero = self.assemble_shared(rows, cols, vals)
+        return ybus, ybus_pos, ybus_neg, ybus_zero
+
+    def element_stamps(self, element):
+        # COO triplets of one element in each of the four networks (Ybus, pos, neg, zero),
+        # used to apply that element alone to already assembled matrices
+        if isinstance(element, (TransmissionLine, Transformer)):
+            f, t = self.bus_index[element.bus1.name], self.bus_index[element.bus2.name]
+            rows = np.array([f, f, t, t])
+            cols = np.array([f, t, f, t])
+            prims = [element.yprim, element.yprim, element.yprim_neg, element.yprim_zero]
+            vals = np.array([[y[0, 0], y[0, 1], y[1, 0], y[1, 1]] for y in prims], dtype=complex)
+        elif isinstance(element, Generator):
+            rows = cols = np.array([self.bus_index[element.bus.name]])
+            vals = np.array([[0], [element.y_prim_positive_sequence()], [element.y_prim_negative_sequence()],
+                             [element.y_prim_zero_sequence()]], dtype=complex)
+        elif isinstance(element, Load):
+            rows = cols = np.array([self.bus_index[element.bus.name]])
+            y = element.y_prim()
+            vals = np.array([[0], [y], [y], [0]], dtype=complex)
+        else:
+            raise ValueError(f"Cannot stamp element of type {type(element).__name__}.")
+
+        return rows, cols, vals
+
+    def apply_stamps(self, matrices, stamps):
+        # adds the queued element stamps (rows, cols, vals) to the assembled matrices, growing them
+        # first if buses were added; returns new matrices and leaves the originals untouched
+        N = self.N
+        resized = []
+        for M in matrices:
+            n = M.shape[0]
+            if n < N:
+                M = sp.csr_matrix((M.data, M.indices, np.concatenate((M.indptr, np.full(N - n, M.indptr[-1])))),
+                                  shape=(N, N))
+            resized.append(M)
+
+        if not stamps:
+            return resized
+
+        rows = np.concatenate([s[0] for s in stamps])
+        cols = np.concatenate([s[1] for s in stamps])
+        vals = np.concatenate([s[2] for s in stamps], axis=1)
+
+        return [(M + sp.coo_matrix((vals[k], (rows, cols)), shape=(N, N))).tocsr()
+                for k, M in enumerate(resized)]
+
+    def assemble_shared(self, rows, cols, vals):
+        # sums duplicate (row, col) triplets once and returns one CSR matrix per row of vals,
+        # all built on the same indices/indptr arrays
+
+        N = self.N
+        keys = rows * N + cols
+        unique_keys, position = np.unique(keys, return_inverse=True)  # row-major order == CSR order
+        indices = (unique_keys % N).astype(np.int32)
+        indptr = np.zeros(N + 1, dtype=np.int32)
+        np.cumsum(np.bincount(unique_keys // N, minlength=N), out=indptr[1:])
+
+        matrices = []
+        for v in vals:
+            data = (np.bincount(position, weights=v.real, minlength=unique_keys.size)
+                    + 1j * np.bincount(position, weights=v.imag, minlength=unique_keys.size))
+            matrices.append(sp.csr_matrix((data, indices, indptr), shape=(N, N)))
+
+        return matrices
+
+    def to_dataframe(self, matrix):
+        # labelled dense view, only built when asked for (printing, small systems)
+        return pd.DataFrame(matrix.toarray(), index=self.bus_names, columns=self.bus_names)
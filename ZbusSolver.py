@@ -0,0 +1,59 @@
+# Group 8 - Project 2
+# ECE 2774
+# Factorized Zbus
+
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from SparseLU import SparseLU
+
+
+class ZbusSolver:
+
+    def __init__(self, ybus, bus_index: dict, max_columns: int = 128, factors=None):
+        # Zbus = Ybus^-1 is never formed; Ybus is LU-factorized once and column n of Zbus
+        # is one forward/back solve against the unit vector e_n
+        # factors: existing TriangularFactors to solve with instead of factorizing ybus
+        self.bus_index = bus_index
+        self.N = factors.N if factors is not None else ybus.shape[0]
+        self.max_columns = max_columns
+        self.cache = OrderedDict()  # bus index -> Zbus column, least recently used first
+
+        if factors is not None:
+            self.lu = factors
+        else:
+            self.lu = SparseLU().factorize(ybus) if self.N > 0 else None  # RuntimeError if singular
+
+    def column(self, bus: str):
+        # column n of Zbus (equal to row n, Ybus is symmetric)
+        n = self.bus_index[bus]
+
+        if n in self.cache:
+            self.cache.move_to_end(n)
+            return self.cache[n]
+
+        e_n = np.zeros(self.N, dtype=complex)
+        e_n[n] = 1
+        z_n = self.lu.solve(e_n)
+
+        self.cache[n] = z_n
+        if len(self.cache) > self.max_columns:
+            self.cache.popitem(last=False)
+
+        return z_n
+
+    def columns(self, buses):
+        # several Zbus columns at once as an (N, len(buses)) array, one multi-RHS solve, not cached
+        idx = np.array([self.bus_index[b] for b in buses], dtype=int)
+        E = np.zeros((self.N, len(idx)), dtype=complex)
+        E[idx, np.arange(len(idx))] = 1
+        return self.lu.solve(E)
+
+    def element(self, bus_k: str, bus_n: str):
+        # Z_kn
+        return self.column(bus_n)[self.bus_index[bus_k]]
+
+    def to_dataframe(self):
+        # full dense Zbus, only for printing small systems
+        bus_names = list(self.bus_index.keys())
+        return pd.DataFrame(self.columns(bus_names), index=bus_names, columns=bus_names)